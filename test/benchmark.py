@@ -0,0 +1,185 @@
+"""
+Throughput and peak memory of the task operations on synthetic workloads.
+
+    python test/benchmark.py                          # 1k, 10k, 100k and 1M tasks
+    python test/benchmark.py --sizes 1000 10000 --backend sqlite --output results.json
+
+Every size runs in its own process with an empty HOME, the tasks come from
+generate.generate_tasks(). Results are printed and written as JSON to --output.
+Peak memory is measured with tracemalloc in a separate run of each operation,
+so it does not slow down the timed one.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Repeat an operation until it ran this many seconds, or its op count is used up
+MIN_SECONDS = 0.5
+OPERATIONS = ("save_tasks", "load_tasks", "get_tasks_by_category_id", "flip_by_key", "delete_task_by_uuid", "purge")
+
+def _measure(operation, count, setup=None):
+    """
+    Run operation(i) for i in range(count), stopping early after MIN_SECONDS.
+    setup runs before every call and is not timed. Returns the calls and seconds.
+    """
+    done = 0
+    seconds = 0.0
+    while done < count and seconds < MIN_SECONDS:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        operation(done)
+        seconds += time.perf_counter() - start
+        done += 1
+    return done, seconds
+
+def _measure_peak(operation, setup=None):
+    """Peak bytes allocated by a single call of operation"""
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        operation(0)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_size(args):
+    """Benchmark one size in this process, HOME already points to an empty directory"""
+    import generate
+    import todoism.state as st
+    import todoism.backup as bkp
+    import todoism.view as vw
+    import todoism.task as tsk
+    import todoism.command as cmd
+    import todoism.category as cat
+    import todoism.taskrecord as rec
+    import todoism.taskstore as ts
+
+    # Backups of huge lists would be written in the middle of timed operations
+    bkp.BACKUP_DELAY = 24 * 3600
+    rng = random.Random(args.seed)
+    categories = generate.generate_categories(args.categories)
+    cat.save_categories(categories)
+    generated = generate.generate_tasks(args.size, args.categories, args.seed, args.done_ratio,
+                                        args.flagged_ratio, args.due_ratio, args.length)
+    task_list = ts.TaskStore([rec.Task.from_dict(task) for task in generated])
+    del generated
+
+    def select_all(task_list):
+        st.current_category_id = 0
+        st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, 0)
+        vw.rebuild(categories)
+
+    results = {}
+    def record(name, operation, count, setup=None):
+        done, seconds = _measure(operation, count, setup)
+        results[name] = {
+            "ops": done,
+            "seconds": round(seconds, 6),
+            "ops_per_sec": round(done / seconds, 2),
+            "peak_bytes": _measure_peak(operation, setup) if args.memory else None,
+        }
+
+    record("save_tasks", lambda i: tsk.save_tasks(task_list), args.ops)
+    record("load_tasks", lambda i: tsk.load_tasks(), args.ops)
+    task_list = tsk.load_tasks()
+    category_ids = [category["id"] for category in categories]
+    record("get_tasks_by_category_id",
+           lambda i: tsk.get_tasks_by_category_id(task_list, category_ids[i % len(category_ids)]),
+           args.ops * 100)
+
+    select_all(task_list)
+    record("flip_by_key", lambda i: tsk.flip_by_key(rng.randrange(len(st.current_cat_tasks)), "done", task_list),
+           args.ops * 100)
+
+    uuids = [task["uuid"] for task in task_list]
+    rng.shuffle(uuids)
+    def delete(i):
+        tsk.delete_task_by_uuid(task_list, uuids.pop())
+    record("delete_task_by_uuid", delete, min(args.ops * 100, len(uuids) // 2))
+
+    # Every purge needs done tasks to remove, so each one starts from the stored list
+    def load_all():
+        nonlocal task_list
+        task_list = tsk.load_tasks()
+        select_all(task_list)
+    def purge(i):
+        nonlocal task_list
+        task_list = cmd.purge(task_list)
+    record("purge", purge, args.ops, load_all)
+    return results
+
+def _run_worker(args, size):
+    with tempfile.TemporaryDirectory() as home:
+        os.makedirs(os.path.join(home, ".todoism"))
+        with open(os.path.join(home, ".todoism", "settings.json"), 'w') as file:
+            json.dump({"storage_backend": args.backend}, file)
+        env = dict(os.environ, HOME=home, PYTHONPATH=ROOT_DIR)
+        command = [sys.executable, __file__, "--worker", "--size", str(size)] + _shared_args(args)
+        output = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+def _shared_args(args):
+    shared = ["--backend", args.backend, "--seed", str(args.seed), "--categories", str(args.categories),
+              "--ops", str(args.ops), "--done-ratio", str(args.done_ratio), "--flagged-ratio", str(args.flagged_ratio),
+              "--due-ratio", str(args.due_ratio), "--length", args.length]
+    return shared if args.memory else shared + ["--no-memory"]
+
+def main():
+    import generate
+
+    parser = argparse.ArgumentParser(description="Benchmark task operations on synthetic workloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backend", choices=("file", "sqlite"), default="file")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--ops", type=int, default=20, help="repetitions of the full-list operations, "
+                        "single-task operations run 100 times as many")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--done-ratio", type=float, default=0.3)
+    parser.add_argument("--flagged-ratio", type=float, default=0.1)
+    parser.add_argument("--due-ratio", type=float, default=0.25)
+    parser.add_argument("--length", choices=generate.LENGTHS, default="uniform")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_size(args), sys.stdout)
+        return
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "workload": {key: getattr(args, key) for key in
+                     ("seed", "categories", "done_ratio", "flagged_ratio", "due_ratio", "length")},
+        "results": [],
+    }
+    print(f"{'tasks':>9} {'operation':>24} {'ops':>6} {'ops/s':>12} {'peak MiB':>9}")
+    for size in args.sizes:
+        results = _run_worker(args, size)
+        for name in OPERATIONS:
+            result = results[name]
+            report["results"].append({"tasks": size, "operation": name, **result})
+            peak = "-" if result["peak_bytes"] is None else f"{result['peak_bytes'] / 2**20:.2f}"
+            print(f"{size:>9} {name:>24} {result['ops']:>6} {result['ops_per_sec']:>12.1f} {peak:>9}")
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=4)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
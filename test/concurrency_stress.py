@@ -0,0 +1,83 @@
+"""
+Concurrent writers against one data directory, nothing may get lost.
+
+    python test/concurrency_stress.py
+    python test/concurrency_stress.py --processes 16 --adds 100 --backend sqlite
+
+Starts --processes workers that each add --adds tasks with add_new_task_cli,
+like cron jobs running `todoism add`. Meanwhile one worker behaves like the
+TUI: it keeps a stale task list in memory, changes its own tasks and does
+full saves. Afterwards every added task must exist exactly once and every
+change of the TUI-like worker must be stored.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def add_worker(worker, count):
+    import todoism.task as tsk
+    for i in range(count):
+        tsk.add_new_task_cli(f"cli {worker} {i}")
+
+def full_save_worker(count):
+    import todoism.task as tsk
+    task_list = tsk.load_tasks()
+    for i in range(count):
+        task_list = tsk.add_new_task(task_list, len(task_list) + 1, f"tui {i}")
+    own_tasks = [task for task in task_list if task["description"].startswith("tui ")]
+    # The list is never reloaded, every save has to merge what the other workers added
+    for task in own_tasks:
+        task["done"] = True
+        tsk.save_tasks(task_list)
+
+def check(adders, adds, saves):
+    import todoism.task as tsk
+    descriptions = [task["description"] for task in tsk.load_tasks()]
+    expected = {f"cli {worker} {i}" for worker in range(adders) for i in range(adds)}
+    missing = expected - set(descriptions)
+    duplicated = len(descriptions) - len(set(descriptions))
+    tui_tasks = [task for task in tsk.load_tasks() if task["description"].startswith("tui ")]
+    not_done = [task["description"] for task in tui_tasks if not task["done"]]
+    print(f"{len(descriptions)} tasks, {len(missing)} lost, {duplicated} duplicated, "
+          f"{len(tui_tasks)}/{saves} full-save tasks, {len(not_done)} of them lost their change")
+    return not missing and not duplicated and len(tui_tasks) == saves and not not_done
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent writers")
+    parser.add_argument("--processes", type=int, default=8, help="number of adding processes")
+    parser.add_argument("--adds", type=int, default=50, help="tasks added per process")
+    parser.add_argument("--saves", type=int, default=30, help="full saves of the TUI-like process")
+    parser.add_argument("--backend", choices=("file", "sqlite"), default="file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker == "tui":
+        full_save_worker(args.saves)
+        return
+    if args.worker is not None:
+        add_worker(args.worker, args.adds)
+        return
+
+    with tempfile.TemporaryDirectory() as home:
+        os.makedirs(os.path.join(home, ".todoism"))
+        with open(os.path.join(home, ".todoism", "settings.json"), 'w') as file:
+            json.dump({"storage_backend": args.backend}, file)
+        env = dict(os.environ, HOME=home, PYTHONPATH=ROOT_DIR)
+        common = [sys.executable, __file__, "--adds", str(args.adds), "--saves", str(args.saves)]
+        workers = [subprocess.Popen(common + ["--worker", "tui"], env=env)]
+        workers += [subprocess.Popen(common + ["--worker", str(i)], env=env) for i in range(args.processes)]
+        failed = any(worker.wait() != 0 for worker in workers)
+
+        os.environ["HOME"] = home
+        sys.path.insert(0, ROOT_DIR)
+        ok = check(args.processes, args.adds, args.saves) and not failed
+    print("ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Throughput of due.parse_due_date against the previous one-regex-per-format parser.
+
+    python test/due_benchmark.py              # 1M descriptions
+    python test/due_benchmark.py 100000
+"""
+import re
+import sys
+import time
+import random
+
+import todoism.due as due
+
+DEFAULT_COUNT = 1_000_000
+WORDS = "buy milk call mom fix bug write report review code plan trip pay rent email boss".split()
+DUES = [
+    "", "", "", "", "[2030-01-02 12:30]", "[2030-01-02]", "[12-25 09:00]", "[12-25]",
+    "[18:00]", "[tomorrow]", "[+3d]", "[next mon]", "[not a date]",
+]
+
+def legacy_parse_due_date(description):
+    """parse_due_date before the single grammar, for comparison"""
+    patterns = [
+        r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2})\]',
+        r'\[(\d{4}-\d{1,2}-\d{1,2})\]',
+        r'\[(\d{2}-\d{2} \d{2}:\d{2})\]',
+        r'\[(\d{1,2}-\d{1,2})\]',
+        r'\[(\d{2}:\d{2})\]',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, description)
+        if match:
+            due_date = match.group(1) if match.groups() else match.group(0).strip("[]")
+            remaining_text = description[:match.start()] + description[match.end():]
+            return due_date, remaining_text.strip()
+    return "", description.strip()
+
+def make_descriptions(count, seed=0):
+    rng = random.Random(seed)
+    descriptions = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randrange(2, 8))]
+        words.insert(rng.randrange(len(words) + 1), rng.choice(DUES))
+        descriptions.append(" ".join(words))
+    return descriptions
+
+def bench(parse, descriptions):
+    start = time.perf_counter()
+    for description in descriptions:
+        parse(description)
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    descriptions = make_descriptions(count)
+    print(f"{'parser':>8} {'seconds':>8} {'per second':>12}")
+    for name, parse in (("legacy", legacy_parse_due_date), ("grammar", due.parse_due_date)):
+        elapsed = bench(parse, descriptions)
+        print(f"{name:>8} {elapsed:>8.3f} {count / elapsed:>12.0f}")
+
+if __name__ == "__main__":
+    main()
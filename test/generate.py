@@ -1,6 +1,18 @@
+"""
+Write a data directory for `python -m todoism --dev` into test/.todoism.
+
+    python test/generate.py                 # the hand-written tasks below
+    python test/generate.py --tasks 10000 --categories 8 --seed 1 --force
+
+With --tasks a synthetic workload is generated instead, the same seed and
+options always give the same tasks. test/benchmark.py uses generate_tasks()
+and generate_categories() directly.
+"""
 import os
 import json
 import uuid
+import random
+import argparse
 from pathlib import Path
 
 import todoism.preference as pref
@@ -784,21 +796,91 @@ test_settings ={
 }
 
 
-# Ensure output directory exists
-out_dir = Path("test/.todoism")
-out_dir.mkdir(exist_ok=True)
+WORDS = (
+    "buy milk call mom fix bug write report review code plan trip pay rent email boss "
+    "clean room book flight read paper update docs renew passport water plants order parts "
+    "prepare slides backup laptop cancel subscription schedule meeting"
+).split()
 
-# Define filenames and data
-files = {
-    "tasks.json": test_tasks,
-    "categories.json": test_categories,
-    "settings.json": pref.default_settings,
+# Number of words in a description for each --length distribution
+LENGTHS = {
+    "short": lambda rng: rng.randint(2, 5),
+    "uniform": lambda rng: rng.randint(1, 24),
+    "longtail": lambda rng: min(40, max(1, round(rng.lognormvariate(1.6, 0.7)))),
 }
 
-# Write files only if they don't exist
-for filename, data in files.items():
-    path = out_dir / filename
-    if not path.exists():
-        with open(path, 'w') as file:
-            json.dump(data, file, indent=4)
-        os.chmod(path, 0o644)  # rw-r--r--
+def generate_categories(count):
+    """All Tasks and count numbered categories"""
+    return [{"id": 0, "name": "All Tasks"}] + [
+        {"id": i, "name": f"Category {i}"} for i in range(1, count + 1)
+    ]
+
+def _random_due(rng):
+    day = f"{rng.randrange(2024, 2031)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+    return rng.choice([day, f"{day} {rng.randrange(24):02d}:{rng.choice(('00', '30'))}"])
+
+def generate_tasks(count, categories=5, seed=0, done_ratio=0.3, flagged_ratio=0.1,
+                   due_ratio=0.25, length="uniform"):
+    """count tasks as dicts of the tasks.json schema, deterministic for a given seed"""
+    rng = random.Random(seed)
+    word_count = LENGTHS[length]
+    tasks = []
+    for i in range(count):
+        description = " ".join(rng.choice(WORDS) for _ in range(word_count(rng)))
+        tasks.append({
+            "uuid": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "id": i + 1,
+            "description": description[:256],
+            "due": _random_due(rng) if rng.random() < due_ratio else "",
+            "created": f"{rng.randrange(2022, 2026)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} "
+                       f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+            "done": rng.random() < done_ratio,
+            "flagged": rng.random() < flagged_ratio,
+            "category_id": rng.randrange(categories + 1),
+        })
+    return tasks
+
+def write_files(out_dir, tasks, categories, settings, overwrite=False):
+    """Write the data files into out_dir, existing ones are kept unless overwrite is set"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = {
+        "tasks.json": tasks,
+        "categories.json": categories,
+        "settings.json": settings,
+    }
+    for filename, data in files.items():
+        path = out_dir / filename
+        if overwrite or not path.exists():
+            with open(path, 'w') as file:
+                json.dump(data, file, indent=4)
+            os.chmod(path, 0o644)  # rw-r--r--
+
+def _ratio(value):
+    value = float(value)
+    if not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError("ratio must be between 0 and 1")
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate test data for todoism --dev")
+    parser.add_argument("--tasks", type=int, help="number of synthetic tasks, the hand-written ones if omitted")
+    parser.add_argument("--categories", type=int, default=5, help="number of categories besides All Tasks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--done-ratio", type=_ratio, default=0.3)
+    parser.add_argument("--flagged-ratio", type=_ratio, default=0.1)
+    parser.add_argument("--due-ratio", type=_ratio, default=0.25)
+    parser.add_argument("--length", choices=LENGTHS, default="uniform", help="distribution of description lengths")
+    parser.add_argument("--out", default="test/.todoism", help="output directory")
+    parser.add_argument("--force", action="store_true", help="overwrite existing files")
+    args = parser.parse_args()
+
+    if args.tasks is None:
+        write_files(args.out, test_tasks, test_categories, pref.default_settings, args.force)
+        return
+    tasks = generate_tasks(args.tasks, args.categories, args.seed, args.done_ratio,
+                           args.flagged_ratio, args.due_ratio, args.length)
+    write_files(args.out, tasks, generate_categories(args.categories), pref.default_settings, args.force)
+
+if __name__ == "__main__":
+    main()
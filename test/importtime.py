@@ -0,0 +1,83 @@
+"""
+Import-time budget of the CLI commands, measured with python -X importtime.
+
+    python test/importtime.py
+    python test/importtime.py --budget-ms 80 --runs 5
+
+Every command runs against a temporary HOME. The check fails if a command
+imports a TUI-only module, or if the best of several runs spends more
+than the budget importing modules after interpreter startup.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = [
+    ["add", "import time budget"],
+    ["list"],
+    ["delete", "1"],
+]
+
+# Modules only the TUI or the update check may need
+FORBIDDEN = {
+    "curses", "_curses", "todoism.main", "todoism.print", "todoism.edit", "todoism.command",
+    "todoism.keycode", "todoism.theme", "todoism.update", "urllib.request", "importlib.metadata",
+}
+
+def measure(command, home):
+    env = dict(os.environ, HOME=home, PYTHONPATH=ROOT_DIR)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "todoism", *command],
+        env=env, capture_output=True, text=True, cwd=home
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"todoism {' '.join(command)} failed:\n{result.stderr}")
+
+    modules = set()
+    total_us = 0
+    after_startup = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level after the separator's space
+        is_top_level = not name.startswith("  ")
+        name = name.strip()
+        if after_startup:
+            modules.add(name)
+            if is_top_level:
+                total_us += int(cumulative)
+        elif is_top_level and name == "site":
+            # Everything up to site is interpreter startup
+            after_startup = True
+    return total_us / 1000, modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time budget of the CLI commands")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="allowed import time per command")
+    parser.add_argument("--runs", type=int, default=3, help="runs per command, the fastest one counts")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        for command in COMMANDS:
+            timings = []
+            modules = set()
+            for _ in range(args.runs):
+                elapsed_ms, modules = measure(command, home)
+                timings.append(elapsed_ms)
+            best = min(timings)
+            forbidden = sorted(FORBIDDEN & modules)
+            ok = best <= args.budget_ms and not forbidden
+            failed = failed or not ok
+            print(f"{'ok  ' if ok else 'FAIL'} todoism {' '.join(command):<28} {best:7.1f} ms  ({len(modules)} modules)")
+            if forbidden:
+                print(f"     imports TUI-only modules: {', '.join(forbidden)}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
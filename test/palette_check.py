@@ -0,0 +1,74 @@
+"""
+Drawing must never define color pairs, only setup and theme changes may.
+
+    python test/palette_check.py
+
+Runs curses on a pseudo terminal, sets up the palette, then draws done
+tasks with due dates (the dimmed pair) and re-applies the unchanged theme
+many times. Fails if any of that calls curses.init_pair.
+"""
+import os
+import pty
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 1000
+
+def check(stdscr):
+    import todoism.state as st
+    import todoism.theme as thm
+    import todoism.print as pr
+    import todoism.task as tsk
+
+    curses.start_color()
+    thm.setup_color_pairs()
+    st.latest_max_y, st.latest_max_x = stdscr.getmaxyx()
+    setup_count = thm.get_init_pair_count()
+
+    task = tsk.create_new_task(1, "done task with a due date", due="2030-01-02")
+    task["done"] = True
+    for i in range(ROWS):
+        pr.print_task_entry(stdscr, task, i % (st.latest_max_y - 2) + 1, False, 16)
+        thm.apply_theme()
+    stdscr.refresh()
+    drawing_count = thm.get_init_pair_count() - setup_count
+
+    st.theme_color = "red" if st.theme_color != "red" else "blue"
+    thm.apply_theme()
+    theme_change_count = thm.get_init_pair_count() - setup_count - drawing_count
+    return setup_count, drawing_count, theme_change_count
+
+def main():
+    read_fd, write_fd = os.pipe()
+    pid, _ = pty.fork()
+    if pid == 0:
+        os.environ["TERM"] = "xterm-256color"
+        sys.path.insert(0, ROOT_DIR)
+        global curses
+        import curses
+        result = curses.wrapper(check)
+        os.write(write_fd, " ".join(map(str, result)).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    # Drain the terminal output so the child never blocks on a full pty
+    while True:
+        try:
+            if not os.read(_, 65536):
+                break
+        except OSError:
+            break
+    _, status = os.waitpid(pid, 0)
+    result = os.read(read_fd, 1024).decode().split()
+    if status != 0 or len(result) != 3:
+        print("FAIL: the check did not run")
+        sys.exit(1)
+    setup_count, drawing_count, theme_change_count = map(int, result)
+    print(f"init_pair calls: {setup_count} at setup, {drawing_count} while drawing {ROWS} rows, "
+          f"{theme_change_count} for a theme change")
+    ok = drawing_count == 0 and theme_change_count == 1
+    print("ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Rendering cost of print.py without a visible terminal.
+
+    python test/render_benchmark.py
+    python test/render_benchmark.py --terminals 80x24 200x60 --tasks 100 100000 --frames 1000 --output render.json
+
+Every terminal size and task count runs in a child process on a pseudo
+terminal, so curses writes real escape sequences that this process reads
+and counts. The child's stdscr is wrapped to count window calls. Scenarios:
+
+    full        print_whole_view after stdscr.clear(), as after a resize
+    redraw      print_whole_view after invalidating the last frame, as after most keys
+    navigate    print_whole_view while the selection moves down, like KEY_DOWN
+    entries     print_task_entries while the selection moves down
+    status      print_status_bar alone
+
+Reports frames per second, curses window calls, bytes written to the terminal
+and color pairs defined per frame.
+"""
+import os
+import pty
+import sys
+import json
+import time
+import fcntl
+import select
+import struct
+import termios
+import argparse
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ("full", "redraw", "navigate", "entries", "status")
+DEFAULT_TERMINALS = ["80x24", "120x40", "200x60"]
+DEFAULT_TASKS = [100, 10_000]
+# Output is complete once the terminal stayed silent this long
+QUIET_SECONDS = 0.2
+
+class CountingWindow:
+    """Forwards everything to a curses window and counts the method calls"""
+    def __init__(self, window):
+        self._window = window
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._window, name)
+        if not callable(attr):
+            return attr
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+        return counted
+
+def _terminal_size(text):
+    cols, rows = text.lower().split("x")
+    return int(cols), int(rows)
+
+def _setup_state(stdscr, task_count, args):
+    import generate
+    import todoism.state as st
+    import todoism.theme as thm
+    import todoism.navigate as nv
+    import todoism.category as cat
+    import todoism.taskrecord as rec
+    import todoism.taskstore as ts
+    import todoism.view as vw
+
+    categories = generate.generate_categories(args.categories)
+    cat.save_categories(categories)
+    tasks = generate.generate_tasks(task_count, args.categories, args.seed)
+    task_list = ts.TaskStore([rec.Task.from_dict(task) for task in tasks])
+
+    thm.setup_color_pairs()
+    stdscr.bkgd(' ', thm.get_bkg_color_pair())
+    st.tag = True
+    st.strikethrough = True
+    st.focus_manager = nv.FocusManager()
+    st.latest_max_y, st.latest_max_x = stdscr.getmaxyx()
+    st.latest_max_capacity = st.latest_max_y - 2 - 2
+    st.current_category_id = 0
+    st.cat_cnt = len(categories)
+    st.current_cat_tasks = task_list
+    vw.rebuild(categories)
+    st.task_cnt = len(st.current_cat_tasks)
+    _select_first()
+    return categories
+
+def _select_first():
+    import todoism.state as st
+    st.current_task_id = st.current_task_row = st.start_task_id = 1 if st.task_cnt > 0 else 0
+    st.end_task_id = min(st.latest_max_capacity, st.task_cnt)
+
+def _move_down():
+    import todoism.state as st
+    import todoism.navigate as nv
+    if not nv.keydown_update(True):
+        _select_first()
+
+def _frame_function(scenario, window, categories):
+    import todoism.print as pr
+    import todoism.category as cat
+
+    def full():
+        window.clear()
+        pr.invalidate_frame()
+        pr.print_whole_view(window, categories, 0)
+    def redraw():
+        pr.invalidate_frame()
+        pr.print_whole_view(window, categories, 0)
+    def navigate():
+        _move_down()
+        pr.print_whole_view(window, categories, 0)
+    def entries():
+        _move_down()
+        pr.print_task_entries(window, cat.SIDEBAR_WIDTH)
+    def status():
+        pr.print_status_bar(window)
+    return {"full": full, "redraw": redraw, "navigate": navigate, "entries": entries, "status": status}[scenario]
+
+def child(channel, ack, task_count, args):
+    """Runs on the pseudo terminal, renders every scenario and reports over channel"""
+    import curses
+    import todoism.print as pr
+    import todoism.theme as thm
+
+    def run(stdscr):
+        curses.curs_set(0)
+        curses.start_color()
+        categories = _setup_state(stdscr, task_count, args)
+        window = CountingWindow(stdscr)
+        results = {}
+        for scenario in args.scenarios:
+            _select_first()
+            pr.invalidate_frame()
+            stdscr.clear()
+            pr.print_whole_view(stdscr, categories, 0)
+            stdscr.refresh()
+            frame = _frame_function(scenario, window, categories)
+            # The parent drains the setup output before the frames are counted
+            os.write(channel, b"ready\n")
+            os.read(ack, 1)
+            window.calls = 0
+            init_pairs = thm.get_init_pair_count()
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                frame()
+                window.refresh()
+            seconds = time.perf_counter() - start
+            results[scenario] = {
+                "seconds": seconds,
+                "calls": window.calls,
+                "init_pairs": thm.get_init_pair_count() - init_pairs,
+            }
+            os.write(channel, b"done\n")
+            os.read(ack, 1)
+        return results
+
+    results = curses.wrapper(run)
+    os.write(channel, (json.dumps(results) + "\n").encode())
+
+def _drain(master, seconds):
+    """Read terminal output until it stayed silent for seconds, returns the byte count"""
+    count = 0
+    while select.select([master], [], [], seconds)[0]:
+        try:
+            data = os.read(master, 65536)
+        except OSError:
+            break
+        if not data:
+            break
+        count += len(data)
+    return count
+
+def _read_line(channel, master):
+    """
+    The next line the child reports and the terminal bytes read meanwhile.
+    The terminal is read while waiting, a full pty would block the child.
+    """
+    line = b""
+    count = 0
+    while not line.endswith(b"\n"):
+        readable = select.select([channel, master], [], [])[0]
+        if master in readable:
+            count += _drain(master, 0)
+        if channel in readable:
+            data = os.read(channel, 65536)
+            if not data:
+                break
+            line += data
+    return line.decode().strip(), count
+
+def measure(size, task_count, args):
+    cols, rows = size
+    channel, channel_write = os.pipe()
+    ack_read, ack = os.pipe()
+    with tempfile.TemporaryDirectory() as home:
+        pid, master = pty.fork()
+        if pid == 0:
+            os.environ.update(HOME=home, TERM="xterm-256color", LINES=str(rows), COLUMNS=str(cols))
+            fcntl.ioctl(sys.stdout.fileno(), termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+            sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, "test")]
+            try:
+                child(channel_write, ack_read, task_count, args)
+            except BaseException as e:
+                os.write(channel_write, f"error {e!r}\n".encode())
+                os._exit(1)
+            os._exit(0)
+
+        os.close(channel_write)
+        os.close(ack_read)
+        byte_counts = {}
+        try:
+            for scenario in args.scenarios:
+                line, _ = _read_line(channel, master)
+                if line != "ready":
+                    break
+                _drain(master, QUIET_SECONDS)
+                os.write(ack, b"x")
+                line, count = _read_line(channel, master)
+                if line != "done":
+                    break
+                byte_counts[scenario] = count + _drain(master, QUIET_SECONDS)
+                os.write(ack, b"x")
+            else:
+                line, _ = _read_line(channel, master)
+        finally:
+            _drain(master, QUIET_SECONDS)
+            os.waitpid(pid, 0)
+            for fd in (master, channel, ack):
+                os.close(fd)
+    if not line.startswith("{"):
+        sys.exit(f"render child failed: {line}")
+    results = json.loads(line)
+    for scenario, result in results.items():
+        result["bytes"] = byte_counts[scenario]
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rendering on a pseudo terminal")
+    parser.add_argument("--terminals", nargs="+", default=DEFAULT_TERMINALS, help="sizes as COLSxROWS")
+    parser.add_argument("--tasks", type=int, nargs="+", default=DEFAULT_TASKS)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = []
+    print(f"{'terminal':>9} {'tasks':>7} {'scenario':>9} {'frames/s':>10} {'calls/frame':>12} "
+          f"{'bytes/frame':>12} {'pairs/frame':>12}")
+    for terminal in args.terminals:
+        for task_count in args.tasks:
+            results = measure(_terminal_size(terminal), task_count, args)
+            for scenario in args.scenarios:
+                result = results[scenario]
+                row = {
+                    "terminal": terminal,
+                    "tasks": task_count,
+                    "scenario": scenario,
+                    "frames": args.frames,
+                    "frames_per_sec": round(args.frames / result["seconds"], 2),
+                    "calls_per_frame": round(result["calls"] / args.frames, 2),
+                    "bytes_per_frame": round(result["bytes"] / args.frames, 2),
+                    "init_pairs_per_frame": round(result["init_pairs"] / args.frames, 4),
+                }
+                report.append(row)
+                print(f"{terminal:>9} {task_count:>7} {scenario:>9} {row['frames_per_sec']:>10.1f} "
+                      f"{row['calls_per_frame']:>12.1f} {row['bytes_per_frame']:>12.1f} "
+                      f"{row['init_pairs_per_frame']:>12.4f}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+"""
+Keystroke to screen update latency of `todoism --dev`, on a pseudo terminal.
+
+    python test/replay.py                                 # all built-in workflows
+    python test/replay.py --workflows navigation search --tasks 5000 --output latency.json
+    python test/replay.py --record session.json --workflow edit   # type yourself, q quits
+    python test/replay.py --script session.json
+
+Unlike test/integration.py this needs no desktop terminal: todoism runs on a
+pty, its output goes through the small VT parser below into a screen grid.
+test/.todoism is filled with a generated workload and restored afterwards.
+
+A script is a JSON list of events {"t": seconds, "keys": str, "workflow": str,
+"expect": optional text}. Before each event the previous update has to settle,
+then the recorded gap to the previous event is kept. The latency of an event
+is the time from writing its keys until the last byte of the update, or until
+the expected text shows up on the screen. Keys whose update starts with an
+early echo followed by a longer silence need an expect text.
+"""
+import os
+import pty
+import sys
+import json
+import time
+import tty
+import fcntl
+import codecs
+import select
+import shutil
+import struct
+import termios
+import argparse
+import tempfile
+import unicodedata
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "test", ".todoism")
+sys.path.insert(0, ROOT_DIR)
+
+DOWN = "\x1bOB"
+UP = "\x1bOA"
+ENTER = "\r"
+ESC = "\x1b"
+# Seconds without output after which an update counts as complete
+SETTLE_SECONDS = 0.05
+# Seconds to wait for the first byte of an update
+UPDATE_TIMEOUT = 2.0
+WORKFLOWS = ("navigation", "add", "edit", "search", "purge")
+
+class Screen:
+    """
+    Character grid fed with terminal output. Understands the subset of VT100
+    and xterm sequences ncurses uses for xterm-256color, attributes are ignored.
+    """
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._state = self._normal
+        self._sequence = ""
+        self.reset()
+
+    def reset(self):
+        self.grid = [[" "] * self.cols for _ in range(self.rows)]
+        self.x = self.y = 0
+        self.top, self.bottom = 0, self.rows - 1
+        self._saved = (0, 0)
+
+    def display(self) -> list:
+        return ["".join(row) for row in self.grid]
+
+    def contains(self, text) -> bool:
+        return any(text in line for line in self.display())
+
+    def feed(self, data: bytes):
+        for ch in self._decoder.decode(data):
+            self._state(ch)
+
+    def _normal(self, ch):
+        if ch == "\x1b":
+            self._state = self._escape
+        elif ch == "\r":
+            self.x = 0
+        elif ch in "\n\x0b\x0c":
+            self._linefeed()
+        elif ch == "\b":
+            self.x = max(0, min(self.x, self.cols - 1) - 1)
+        elif ch == "\t":
+            self.x = min(self.cols - 1, (self.x // 8 + 1) * 8)
+        elif ch >= " " and ch != "\x7f":
+            self._put(ch)
+
+    def _put(self, ch):
+        if unicodedata.combining(ch):
+            x = min(self.x, self.cols) - 1
+            if x >= 0:
+                self.grid[self.y][x] += ch
+            return
+        width = 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+        if self.x + width > self.cols:
+            self.x = 0
+            self._linefeed()
+        self.grid[self.y][self.x] = ch
+        if width == 2:
+            self.grid[self.y][self.x + 1] = ""
+        # x == cols is the pending wrap of the last column
+        self.x += width
+
+    def _linefeed(self):
+        if self.y == self.bottom:
+            self._scroll_up(1)
+        elif self.y < self.rows - 1:
+            self.y += 1
+
+    def _scroll_up(self, count):
+        for _ in range(count):
+            del self.grid[self.top]
+            self.grid.insert(self.bottom, [" "] * self.cols)
+
+    def _scroll_down(self, count):
+        for _ in range(count):
+            del self.grid[self.bottom]
+            self.grid.insert(self.top, [" "] * self.cols)
+
+    def _escape(self, ch):
+        self._state = self._normal
+        if ch == "[":
+            self._sequence = ""
+            self._state = self._csi
+        elif ch == "]":
+            self._state = self._osc
+        elif ch in "()*+":
+            self._state = self._charset
+        elif ch == "7":
+            self._saved = (self.x, self.y)
+        elif ch == "8":
+            self.x, self.y = self._saved
+        elif ch == "D":
+            self._linefeed()
+        elif ch == "E":
+            self.x = 0
+            self._linefeed()
+        elif ch == "M":
+            if self.y == self.top:
+                self._scroll_down(1)
+            elif self.y > 0:
+                self.y -= 1
+        elif ch == "c":
+            self.reset()
+
+    def _charset(self, ch):
+        self._state = self._normal
+
+    def _osc(self, ch):
+        # Titles and the like end with BEL or ESC \
+        if ch == "\x07":
+            self._state = self._normal
+        elif ch == "\x1b":
+            self._state = self._charset
+
+    def _csi(self, ch):
+        if not "@" <= ch <= "~":
+            self._sequence += ch
+            return
+        self._state = self._normal
+        private = self._sequence[:1] in ("?", ">", "=")
+        params = [int(p) if p.isdigit() else 0 for p in self._sequence.lstrip("?>=").split(";")]
+        first = params[0] or 1
+        if private:
+            if ch in "hl" and set(params) & {47, 1047, 1049}:
+                # Switching to or from the alternate screen
+                self.reset()
+            return
+        x = min(self.x, self.cols - 1)
+        row = self.grid[self.y]
+        if ch in "Hf":
+            self.y = min(first, self.rows) - 1
+            self.x = min(params[1] if len(params) > 1 and params[1] else 1, self.cols) - 1
+        elif ch == "A":
+            self.y = max(self.top if self.y >= self.top else 0, self.y - first)
+        elif ch in "Be":
+            self.y = min(self.bottom if self.y <= self.bottom else self.rows - 1, self.y + first)
+        elif ch in "Ca":
+            self.x = min(self.cols - 1, x + first)
+        elif ch == "D":
+            self.x = max(0, x - first)
+        elif ch == "E":
+            self.x, self.y = 0, min(self.rows - 1, self.y + first)
+        elif ch == "F":
+            self.x, self.y = 0, max(0, self.y - first)
+        elif ch in "G`":
+            self.x = min(first, self.cols) - 1
+        elif ch == "d":
+            self.y = min(first, self.rows) - 1
+        elif ch == "J":
+            start, end = {0: (self.y + 1, self.rows), 1: (0, self.y), 2: (0, self.rows), 3: (0, self.rows)}[params[0]]
+            for y in range(start, end):
+                self.grid[y] = [" "] * self.cols
+            if params[0] == 0:
+                row[x:] = [" "] * (self.cols - x)
+            elif params[0] == 1:
+                row[:x + 1] = [" "] * (x + 1)
+        elif ch == "K":
+            if params[0] == 0:
+                row[x:] = [" "] * (self.cols - x)
+            elif params[0] == 1:
+                row[:x + 1] = [" "] * (x + 1)
+            else:
+                self.grid[self.y] = [" "] * self.cols
+        elif ch == "X":
+            count = min(first, self.cols - x)
+            row[x:x + count] = [" "] * count
+        elif ch == "@":
+            count = min(first, self.cols - x)
+            row[x:x] = [" "] * count
+            del row[self.cols:]
+        elif ch == "P":
+            count = min(first, self.cols - x)
+            del row[x:x + count]
+            row.extend([" "] * count)
+        elif ch in "LM" and self.top <= self.y <= self.bottom:
+            top = self.top
+            self.top = self.y
+            for _ in range(first):
+                (self._scroll_down if ch == "L" else self._scroll_up)(1)
+            self.top = top
+        elif ch == "S":
+            self._scroll_up(first)
+        elif ch == "T":
+            self._scroll_down(first)
+        elif ch == "b":
+            previous = row[x - 1] if 0 < self.x else " "
+            for _ in range(first):
+                self._put(previous)
+        elif ch == "r":
+            self.top = (params[0] or 1) - 1
+            self.bottom = (params[1] if len(params) > 1 and params[1] else self.rows) - 1
+            self.x = self.y = 0
+        elif ch == "s":
+            self._saved = (self.x, self.y)
+        elif ch == "u":
+            self.x, self.y = self._saved
+
+def builtin_events(workflows) -> list:
+    """Scripts for the built-in workflows, keys about as fast as a quick typist"""
+    events = []
+    t = 0.0
+    def key(keys, workflow, expect=None, gap=0.05):
+        nonlocal t
+        t += gap
+        event = {"t": round(t, 3), "keys": keys, "workflow": workflow}
+        if expect:
+            event["expect"] = expect
+        events.append(event)
+    def type_text(text, workflow):
+        for ch in text:
+            key(ch, workflow, gap=0.08)
+
+    for workflow in workflows:
+        if workflow == "navigation":
+            for _ in range(40):
+                key(DOWN, workflow)
+            for _ in range(40):
+                key(UP, workflow)
+        elif workflow == "add":
+            for i in range(5):
+                key("a", workflow)
+                type_text(f"replayed task {i}", workflow)
+                key(ENTER, workflow)
+        elif workflow == "edit":
+            for i in range(5):
+                key(DOWN, workflow)
+                key("e", workflow)
+                type_text(f" edit{i}", workflow)
+                key(ENTER, workflow)
+        elif workflow == "search":
+            for query in ("milk", "report", "trip"):
+                key("/", workflow)
+                type_text(query, workflow)
+                key(ENTER, workflow, expect="Press 'q' to close search")
+                key(DOWN, workflow)
+                key("q", workflow)
+        elif workflow == "purge":
+            for _ in range(3):
+                key("d", workflow)
+                key(DOWN, workflow)
+            key(":", workflow)
+            type_text("purge", workflow)
+            # The newline is echoed before purging, the hint comes back with the repaint
+            key(ENTER, workflow, expect=":help or '/' to search")
+    return events
+
+def _data_settings():
+    import todoism.preference as pref
+    import todoism.update as up
+    settings = dict(pref.default_settings)
+    # Nonzero key codes skip the key recording screen, a fresh check skips the update check
+    settings.update({"ctrl+left": 1, "ctrl+right": 2, "ctrl+shift+left": 3, "ctrl+shift+right": 4,
+                     "alt+left": 5, "alt+right": 6, "last_update_check": time.time(),
+                     "last_run_version": up.get_current_version()})
+    return settings
+
+class Session:
+    """todoism --dev running on a pty, with its screen"""
+    def __init__(self, cols, rows):
+        self.screen = Screen(cols, rows)
+        self.pid, self.master = pty.fork()
+        if self.pid == 0:
+            fcntl.ioctl(sys.stdout.fileno(), termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+            os.chdir(ROOT_DIR)
+            env = dict(os.environ, TERM="xterm-256color", LINES=str(rows), COLUMNS=str(cols))
+            os.execvpe(sys.executable, [sys.executable, "-m", "todoism", "--dev"], env)
+
+    def read(self, timeout):
+        """Feed output arriving within timeout to the screen, returns the arrival time or None"""
+        if not select.select([self.master], [], [], timeout)[0]:
+            return None
+        try:
+            data = os.read(self.master, 65536)
+        except OSError:
+            data = b""
+        if not data:
+            raise EOFError("todoism exited")
+        self.screen.feed(data)
+        return time.perf_counter()
+
+    def settle(self, timeout=UPDATE_TIMEOUT):
+        """Wait for the next update to finish, returns the time of its last byte or None"""
+        last = self.read(timeout)
+        if last is None:
+            return None
+        while True:
+            arrived = self.read(SETTLE_SECONDS)
+            if arrived is None:
+                return last
+            last = arrived
+
+    def send(self, keys, expect=None):
+        """Write keys, returns the latency of the update they cause in seconds or None"""
+        start = time.perf_counter()
+        os.write(self.master, keys.encode())
+        if expect is None:
+            last = self.settle()
+            return None if last is None else last - start
+        deadline = start + UPDATE_TIMEOUT
+        while not self.screen.contains(expect):
+            if self.read(max(0, deadline - time.perf_counter())) is None:
+                return None
+        latency = time.perf_counter() - start
+        self.settle(SETTLE_SECONDS)
+        return latency
+
+    def close(self):
+        """Quit todoism with q, killing it if it does not exit"""
+        exited = False
+        try:
+            os.write(self.master, b"q")
+            deadline = time.perf_counter() + 2
+            while not exited and time.perf_counter() < deadline:
+                try:
+                    self.read(0.05)
+                except EOFError:
+                    pass
+                exited = os.waitpid(self.pid, os.WNOHANG) != (0, 0)
+        finally:
+            if not exited:
+                os.kill(self.pid, 9)
+                os.waitpid(self.pid, 0)
+            os.close(self.master)
+
+def replay(session, events) -> dict:
+    """Latencies in seconds per workflow, None where the screen did not change"""
+    latencies = {}
+    previous_t = 0.0
+    for event in events:
+        session.settle(SETTLE_SECONDS)
+        time.sleep(max(0.0, event["t"] - previous_t - SETTLE_SECONDS))
+        previous_t = event["t"]
+        latency = session.send(event["keys"], event.get("expect"))
+        if latency is None and event.get("expect"):
+            print(f"{event['workflow']}: {event['expect']!r} did not show up", file=sys.stderr)
+        latencies.setdefault(event["workflow"], []).append(latency)
+    return latencies
+
+def record(session, workflow) -> list:
+    """Pass the keyboard through to todoism until it exits, returns the typed events"""
+    events = []
+    start = time.perf_counter()
+    stdin = sys.stdin.fileno()
+    old = termios.tcgetattr(stdin)
+    tty.setraw(stdin)
+    try:
+        while True:
+            readable = select.select([session.master, stdin], [], [])[0]
+            if session.master in readable:
+                try:
+                    data = os.read(session.master, 65536)
+                except OSError:
+                    break
+                if not data:
+                    break
+                os.write(sys.stdout.fileno(), data)
+            if stdin in readable:
+                keys = os.read(stdin, 1024)
+                events.append({"t": round(time.perf_counter() - start, 3),
+                               "keys": keys.decode(errors="replace"), "workflow": workflow})
+                os.write(session.master, keys)
+    finally:
+        termios.tcsetattr(stdin, termios.TCSADRAIN, old)
+    return events
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def summarize(latencies) -> dict:
+    summary = {}
+    for workflow, values in latencies.items():
+        measured = [value * 1000 for value in values if value is not None]
+        summary[workflow] = {
+            "keys": len(values),
+            "no_update": len(values) - len(measured),
+        }
+        if measured:
+            summary[workflow].update({
+                "p50_ms": round(percentile(measured, 0.5), 2),
+                "p90_ms": round(percentile(measured, 0.9), 2),
+                "p99_ms": round(percentile(measured, 0.99), 2),
+                "max_ms": round(max(measured), 2),
+            })
+    return summary
+
+def main():
+    import generate
+
+    parser = argparse.ArgumentParser(description="Replay keystrokes against todoism --dev on a pty")
+    parser.add_argument("--workflows", nargs="+", choices=WORKFLOWS, default=list(WORKFLOWS))
+    parser.add_argument("--script", help="replay this recorded script instead of the built-in workflows")
+    parser.add_argument("--record", help="record your own keystrokes into this script")
+    parser.add_argument("--workflow", default="recorded", help="workflow name of recorded keystrokes")
+    parser.add_argument("--tasks", type=int, default=1000, help="generated tasks in test/.todoism")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", default="100x30", help="terminal size as COLSxROWS")
+    parser.add_argument("--output", help="also write the summary as JSON to this file")
+    parser.add_argument("--show", action="store_true", help="print the final screen")
+    args = parser.parse_args()
+
+    cols, rows = (int(n) for n in args.size.lower().split("x"))
+    if args.record:
+        cols, rows = shutil.get_terminal_size()
+
+    backup_dir = tempfile.mkdtemp()
+    had_data = os.path.isdir(DATA_DIR)
+    if had_data:
+        shutil.copytree(DATA_DIR, os.path.join(backup_dir, ".todoism"))
+        shutil.rmtree(DATA_DIR)
+    try:
+        generate.write_files(DATA_DIR, generate.generate_tasks(args.tasks, seed=args.seed),
+                             generate.generate_categories(5), _data_settings(), overwrite=True)
+        session = Session(cols, rows)
+        try:
+            session.settle()
+            if args.record:
+                events = record(session, args.workflow)
+                with open(args.record, 'w') as file:
+                    json.dump(events, file, indent=4)
+                print(f"{len(events)} events written to {args.record}")
+                return
+            if args.script:
+                with open(args.script) as file:
+                    events = json.load(file)
+            else:
+                events = builtin_events(args.workflows)
+            latencies = replay(session, events)
+            if args.show:
+                print("\n".join(session.screen.display()))
+        finally:
+            session.close()
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+        if had_data:
+            shutil.copytree(os.path.join(backup_dir, ".todoism"), DATA_DIR)
+        shutil.rmtree(backup_dir)
+
+    summary = summarize(latencies)
+    print(f"{'workflow':>12} {'keys':>5} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'no update':>10}")
+    for workflow, result in summary.items():
+        print(f"{workflow:>12} {result['keys']:>5} {result.get('p50_ms', '-'):>8} {result.get('p90_ms', '-'):>8} "
+              f"{result.get('p99_ms', '-'):>8} {result.get('max_ms', '-'):>8} {result['no_update']:>10}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({"tasks": args.tasks, "size": args.size, "workflows": summary}, file, indent=4)
+
+if __name__ == "__main__":
+    main()
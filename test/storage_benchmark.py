@@ -0,0 +1,63 @@
+"""
+Load and save throughput of every storage format.
+
+    python test/storage_benchmark.py              # 10k and 100k tasks
+    python test/storage_benchmark.py 10000 1000000
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import tempfile
+
+import todoism.codec as codec
+import todoism.taskrecord as rec
+
+DEFAULT_SIZES = [10_000, 100_000]
+WORDS = "buy milk call mom fix bug write report review code plan trip pay rent email boss clean room".split()
+
+def make_tasks(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        rec.Task(
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            i + 1,
+            " ".join(rng.choice(WORDS) for _ in range(rng.randrange(2, 9))),
+            rng.choice(["", "", "", "2030-01-02", "2030-01-02 12:30"]),
+            f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} 12:00:00",
+            rng.random() < 0.3,
+            rng.random() < 0.1,
+            rng.randrange(5)
+        )
+        for i in range(count)
+    ]
+
+def bench(task_list, storage_format, path):
+    start = time.perf_counter()
+    data = codec.dumps(task_list, storage_format)
+    with open(path, 'wb') as file:
+        file.write(data)
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = [task if isinstance(task, rec.Task) else rec.Task.from_dict(task) for task in codec.load(path)]
+    load_time = time.perf_counter() - start
+
+    assert len(loaded) == len(task_list) and loaded[-1] == task_list[-1]
+    return save_time, load_time, len(data)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'tasks':>9} {'format':>8} {'save s':>8} {'load s':>8} {'size MiB':>9} {'save/s':>10} {'load/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "tasks.json")
+        for count in sizes:
+            task_list = make_tasks(count)
+            for storage_format in codec.FORMATS:
+                save_time, load_time, size = bench(task_list, storage_format, path)
+                print(f"{count:>9} {storage_format:>8} {save_time:>8.3f} {load_time:>8.3f} {size / 2**20:>9.2f} "
+                      f"{count / save_time:>10.0f} {count / load_time:>10.0f}")
+
+if __name__ == "__main__":
+    main()
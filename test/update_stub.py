@@ -0,0 +1,90 @@
+"""
+Local stand-in for the PyPI JSON API to exercise the background update check.
+
+    python test/update_stub.py                  # check start_update_check/poll_update against the stub
+    python test/update_stub.py --serve 99.0.0   # serve a version, run todoism with
+                                                # TODOISM_UPDATE_URL=http://127.0.0.1:<port>/
+    python test/update_stub.py --delay 10       # slow server, the check must not block
+
+Settings are written to a temporary HOME, never to the real one.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_server(version, delay=0.0, port=0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps({"info": {"version": version}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+def check(version, delay):
+    server = make_server(version, delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        sys.path.insert(0, ROOT_DIR)
+        import todoism.preference as pref
+        import todoism.update as up
+        pref.setup_default_settings()
+
+        start = time.perf_counter()
+        up.start_update_check(url)
+        started_ms = (time.perf_counter() - start) * 1000
+
+        latest_version = None
+        deadline = time.time() + delay + 5
+        while latest_version is None and time.time() < deadline:
+            latest_version = up.poll_update()
+            time.sleep(0.05)
+
+        print(f"start_update_check returned after {started_ms:.1f} ms")
+        print(f"poll_update announced: {latest_version}")
+        print(f"stored latest_version: {pref.get_setting('latest_version')}")
+        ok = started_ms < 100 and latest_version == version and up.poll_update() is None
+        # A second start within the interval must not hit the network but still announce the cached version
+        up.start_update_check("http://127.0.0.1:1/")
+        ok = ok and up.poll_update() == version
+    server.shutdown()
+    print("ok" if ok else "FAIL")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="PyPI stub for the update check")
+    parser.add_argument("--version", default="99.0.0", help="version the stub reports")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before the stub answers")
+    parser.add_argument("--serve", metavar="VERSION", help="only serve VERSION until interrupted")
+    parser.add_argument("--port", type=int, default=8765, help="port for --serve")
+    args = parser.parse_args()
+
+    if args.serve:
+        server = make_server(args.serve, args.delay, args.port)
+        print(f"TODOISM_UPDATE_URL=http://127.0.0.1:{server.server_port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+    sys.exit(0 if check(args.version, args.delay) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from todoism.main import run
+from todoism.cli import run
 
 if __name__ == "__main__":
     run()
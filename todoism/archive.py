@@ -0,0 +1,158 @@
+import os
+import json
+from datetime import datetime
+
+import todoism.preference as pref
+import todoism.journal as jr
+import todoism.taskrecord as rec
+
+# Purged tasks are appended to numbered segment files, one JSON record per line.
+# index.jsonl maps every purged task uuid to its purge date, segment and byte offset.
+SEGMENT_MAX_BYTES = 1024 * 1024
+INDEX_FILE_NAME = "index.jsonl"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+# uuid -> latest index entry of the index file at _index_path, read up to _index_offset
+_entries_by_uuid = None
+_index_offset = 0
+_index_path = None
+
+def get_index_path() -> str:
+    return os.path.join(pref.get_purged_dir_path(), INDEX_FILE_NAME)
+
+def get_segment_path(segment: int) -> str:
+    return os.path.join(pref.get_purged_dir_path(), f"{SEGMENT_PREFIX}{segment:06d}{SEGMENT_SUFFIX}")
+
+def _segment_numbers() -> list:
+    try:
+        names = os.listdir(pref.get_purged_dir_path())
+    except FileNotFoundError:
+        return []
+    return sorted(
+        int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+        for name in names
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+
+def _current_segment() -> int:
+    """Last segment, or a new one once it reached SEGMENT_MAX_BYTES"""
+    segments = _segment_numbers()
+    if not segments:
+        return 1
+    segment = segments[-1]
+    if os.path.getsize(get_segment_path(segment)) >= SEGMENT_MAX_BYTES:
+        return segment + 1
+    return segment
+
+def append_tasks(tasks):
+    """Append purged tasks to the archive, cost does not depend on the archive size"""
+    if not tasks:
+        return
+    os.makedirs(pref.get_purged_dir_path(), exist_ok=True)
+    _migrate_legacy_file()
+    with jr.lock(pref.get_purged_dir_path()):
+        _append_locked(tasks)
+
+def _append_locked(tasks):
+    """Append tasks to the current segment and the index, the caller must hold the lock"""
+    global _index_offset
+    purged = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    segment = _current_segment()
+    entries = []
+    with open(get_segment_path(segment), 'a') as segment_file:
+        for task in tasks:
+            offset = segment_file.tell()
+            segment_file.write(json.dumps(task, separators=(',', ':'), default=rec.to_json) + '\n')
+            entries.append({
+                "uuid": task.get("uuid"),
+                "purged": purged,
+                "segment": segment,
+                "offset": offset
+            })
+    index_path = get_index_path()
+    with open(index_path, 'a') as index_file:
+        # Only our own entries are new if the loaded index reached the end of the file
+        up_to_date = _entries_by_uuid is not None and _index_path == index_path and index_file.tell() == _index_offset
+        index_file.writelines(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        if up_to_date:
+            for entry in entries:
+                _entries_by_uuid[entry["uuid"]] = entry
+            _index_offset = index_file.tell()
+
+def iter_index():
+    """Yield index entries in purge order without loading any task"""
+    for entry in jr.read_records(get_index_path()):
+        yield entry
+
+def read_entry(entry) -> dict:
+    """Seek to the task an index entry points to"""
+    with open(get_segment_path(entry["segment"]), 'r') as segment_file:
+        segment_file.seek(entry["offset"])
+        return json.loads(segment_file.readline())
+
+def _load_index() -> dict:
+    """
+    uuid -> latest index entry. Read once, later calls only read the lines
+    appended since, by this process or others.
+    """
+    global _entries_by_uuid, _index_offset, _index_path
+    index_path = get_index_path()
+    if _entries_by_uuid is None or _index_path != index_path:
+        _entries_by_uuid, _index_offset, _index_path = {}, 0, index_path
+    try:
+        with open(index_path, 'rb') as index_file:
+            if os.fstat(index_file.fileno()).st_size < _index_offset:
+                # The archive was replaced, start over
+                _entries_by_uuid, _index_offset = {}, 0
+            index_file.seek(_index_offset)
+            for line in index_file:
+                if not line.endswith(b'\n'):
+                    # Still being written, read it next time
+                    break
+                _index_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                _entries_by_uuid[entry["uuid"]] = entry
+    except FileNotFoundError:
+        _entries_by_uuid, _index_offset = {}, 0
+    return _entries_by_uuid
+
+def find_task(task_uuid):
+    """Get the latest purged version of a task by its uuid"""
+    entry = _load_index().get(task_uuid)
+    return read_entry(entry) if entry else None
+
+def find_purged_since(date_str: str) -> list:
+    """Get all tasks purged at or after date_str (YYYY-MM-DD[ HH:MM:SS])"""
+    return [read_entry(entry) for entry in iter_index() if entry["purged"] >= date_str]
+
+def load_tasks() -> list:
+    """Load the whole archive in purge order"""
+    _migrate_legacy_file()
+    tasks = []
+    for segment in _segment_numbers():
+        tasks.extend(jr.read_records(get_segment_path(segment)))
+    return tasks
+
+def _migrate_legacy_file():
+    """Move tasks from the former single purged.json into the archive once"""
+    legacy_path = pref.get_purged_file_path()
+    if not os.path.exists(legacy_path):
+        return
+    os.makedirs(pref.get_purged_dir_path(), exist_ok=True)
+    with jr.lock(pref.get_purged_dir_path()):
+        # Another process may have migrated it while this one waited for the lock
+        if not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, 'r') as file:
+                legacy_tasks = json.load(file)
+        except json.JSONDecodeError:
+            legacy_tasks = []
+        if legacy_tasks:
+            _append_locked(legacy_tasks)
+        # Renamed last, so a crash before leaves the tasks in purged.json
+        os.rename(legacy_path, legacy_path + ".migrated")
@@ -1,24 +1,75 @@
 import os
-import shutil
+import atexit
+import threading
+import time
+from datetime import datetime
 
 import todoism.preference as pref
+import todoism.storage as stg
 
-BACKUP_TASKS_PATH = os.path.join(pref.CONFIG_DIR, "tasks_backup.json")
-BACKUP_CATEGORIES_PATH = os.path.join(pref.CONFIG_DIR, "categories_backup.json")
+# Seconds without changes before a backup is written
+BACKUP_DELAY = 5.0
+# Number of backup generations to keep
+BACKUP_GENERATIONS = 5
+
+_pending = False
+_last_change = 0.0
+_worker = None
+_lock = threading.Lock()
+# Held while a backup is written, so exiting waits for a running one
+_writing = threading.Lock()
+
+def schedule_backup():
+    """Ask for a backup, changes less than BACKUP_DELAY seconds apart are coalesced into one"""
+    global _pending, _last_change, _worker
+    with _lock:
+        _pending = True
+        _last_change = time.monotonic()
+        if _worker is None:
+            _worker = threading.Thread(target=_wait_for_quiet_period, daemon=True)
+            _worker.start()
+
+def _wait_for_quiet_period():
+    global _worker
+    while True:
+        with _lock:
+            remaining = _last_change + BACKUP_DELAY - time.monotonic()
+            if remaining <= 0:
+                _worker = None
+                break
+        time.sleep(remaining)
+    _run_pending()
+
+def flush():
+    """Write a pending backup right away, registered to run on exit"""
+    _run_pending()
+
+def _run_pending():
+    global _pending
+    with _writing:
+        with _lock:
+            if not _pending:
+                return
+            _pending = False
+        backup_data()
+
+atexit.register(flush)
 
 def backup_data():
-    """Backup normal tasks and categories"""
+    """Backup normal tasks and categories into a new generation"""
     try:
-        success = True
-        if os.path.exists(pref.get_tasks_file_path()):
-            shutil.copy2(pref.get_tasks_file_path(), BACKUP_TASKS_PATH)
-        else:
-            success = False
-        if os.path.exists(pref.get_categories_file_path()):
-            shutil.copy2(pref.get_categories_file_path(), BACKUP_CATEGORIES_PATH)
-        else:
-            success = False            
+        generation_dir = os.path.join(pref.get_backup_dir_path(), datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        os.makedirs(generation_dir, exist_ok=True)
+        success = stg.get_storage().backup(generation_dir)
+        _prune_generations()
         return success
     except Exception as e:
         print(f"Error backing up data: {e}")
         return False
+
+def _prune_generations():
+    import shutil
+    backup_dir = pref.get_backup_dir_path()
+    generations = sorted(os.listdir(backup_dir))
+    for generation in generations[:-BACKUP_GENERATIONS]:
+        shutil.rmtree(os.path.join(backup_dir, generation), ignore_errors=True)
@@ -1,27 +1,37 @@
-import json
-
-import todoism.preference as pref
+import todoism.storage as stg
+import todoism.backup as bkp
+import todoism.overlay as ov
 
 MAX_CATEGORY_NAME_LENGTH = 12
 MAX_CATEGORY_COUNT = 128
 SIDEBAR_WIDTH = 16
 NAME_INDENT = 2
 
+# id -> category registry, rebuilt lazily after every save
+_categories_by_id = None
+
+@ov.timed("storage", "load")
 def load_categories():
-    """Load categories from file"""
+    """Load categories from the configured storage"""
     try:
-        with open(pref.get_categories_file_path(), 'r') as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
+        return stg.get_storage().load_categories()
+    except (FileNotFoundError, ValueError):
         # If categories file doesn't exist, create it with default "All Tasks"
         default_categories = [{"id": 0, "name": "All Tasks"}]
         save_categories(default_categories)
         return default_categories
 
+@ov.timed("storage", "save")
 def save_categories(category_list):
-    """Save categories to the categories.json file"""
-    with open(pref.get_categories_file_path(), 'w') as file:
-        json.dump(category_list, file, indent=4)
+    """Save categories to the configured storage"""
+    stg.get_storage().save_categories(category_list)
+    invalidate_category_cache()
+    bkp.schedule_backup()
+
+def invalidate_category_cache():
+    """Drop the in-memory registry so the next lookup reloads the categories"""
+    global _categories_by_id
+    _categories_by_id = None
 
 def create_category(name, color="blue"):
     """Create a new category object"""
@@ -73,12 +83,11 @@ def update_category_name(category_id, new_name):
     return False
 
 def get_category_by_id(category_id):
-    """Get a category by its ID"""
-    categories = load_categories()
-    for category in categories:
-        if category["id"] == category_id:
-            return category
-    return None
+    """Get a category by its ID from the in-memory registry"""
+    global _categories_by_id
+    if _categories_by_id is None:
+        _categories_by_id = {category["id"]: category for category in load_categories()}
+    return _categories_by_id.get(category_id)
 
 def reassign_category_ids():
     """Reassign IDs to categories in sequence, preserving the 'All' category as ID 0"""
@@ -1,11 +1,8 @@
 import os
 import argparse
-import curses
-import importlib.util
 
-import todoism.task as tsk
-import todoism.print as pr
-import todoism.main as main
+# The add, delete and list commands only import the storage layer,
+# curses and the TUI modules are imported when the TUI is started.
 
 def is_dev_environment():
     """
@@ -13,6 +10,7 @@ def is_dev_environment():
     1. Checking if test module exists
     2. Checking if running from source directory
     """
+    import importlib.util
     test_module = importlib.util.find_spec("test")
     package_root = os.path.dirname(os.path.dirname(__file__))
     
@@ -64,6 +62,9 @@ def parse_args():
         parser.add_argument("--profile",
             action="store_true",
             help="enable profiling for performance analysis")
+        parser.add_argument("--overlay",
+            action="store_true",
+            help="show per-key timings and storage counters in the bottom bar")
     
     return parser.parse_args()
 
@@ -71,44 +72,82 @@ def validate_text(text):
     if not text or not text.strip():
         raise argparse.ArgumentTypeError("Todo text cannot be empty")
     return text.strip()
+
+def print_version():
+    print("todoism v1.21.9")
+
+def print_tasks_cli(todos):
+    """Print tasks from any iterable, ids are their positions"""
+    done_fmt = "\033[9m%s\033[0m"     # strikethrough
+    flag_color = "\033[31m%s\033[0m"   # red for flag
+    check_color = "\033[32m%s\033[0m"  # green for checkmark
     
+    count = 0
+    for count, todo in enumerate(todos, start=1):
+        id_part = f'#{count:02d}'
+
+        flag_symbol = flag_color % "⚑ " if todo.get("flagged") else "  "
+        check_symbol = check_color % "✓ " if todo.get("done") else "  "
+        
+        description = todo["description"]
+        if todo.get("done"):
+            description = done_fmt % description
+            
+        todo_line = f'{id_part} {flag_symbol}{check_symbol}{description} ({todo["due"]})'
+        print(todo_line)
+    
+    if count == 0:
+        print("no todos yet")
+
+def run_tui(args):
+    import curses
+    import todoism.main as main
+    
+    if hasattr(args, "dev") and args.dev:
+        if is_dev_environment():
+            import todoism.state as st
+            st.dev_mode = True
+    if hasattr(args, "overlay") and args.overlay:
+        if is_dev_environment():
+            import todoism.overlay as ov
+            ov.enable()
+    if hasattr(args, "profile") and args.profile:
+        if is_dev_environment():
+            import cProfile
+            import pstats
+
+            profile_file = "todoism_profile.prof"
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+            curses.wrapper(main.main)
+
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+
+            p = pstats.Stats(profile_file)
+            p.sort_stats('cumulative').print_stats(30)
+            print(f"\nProfile data saved to: {profile_file}")
+            return
+        else:
+            print("Profile mode not available in PyPi Installation!")
+    else:
+        curses.wrapper(main.main)
+
 def run():
     args = parse_args()
     
     if args.version:
-        pr.print_version()
+        print_version()
     elif args.command == "add":
+        import todoism.task as tsk
         validated_text = validate_text(args.text)
         tsk.add_new_task_cli(validated_text, args.flag)
     elif args.command == "delete":
+        import todoism.task as tsk
         tsk.delete_task_cli(args.id)
     elif args.command == "list":
-        todos = tsk.load_tasks()
-        pr.print_tasks_cli(todos)
+        import todoism.task as tsk
+        print_tasks_cli(tsk.iter_tasks())
     else:
-        if hasattr(args, "dev") and args.dev:
-            if is_dev_environment():
-                import todoism.state as st
-                st.dev_mode = True
-        if hasattr(args, "profile") and args.profile:
-            if is_dev_environment():
-                import cProfile
-                import pstats
-    
-                profile_file = "todoism_profile.prof"
-                profiler = cProfile.Profile()
-                profiler.enable()
-    
-                curses.wrapper(main.main)
-    
-                profiler.disable()
-                profiler.dump_stats(profile_file)
-    
-                p = pstats.Stats(profile_file)
-                p.sort_stats('cumulative').print_stats(30)
-                print(f"\nProfile data saved to: {profile_file}")
-                return
-            else:
-                print("Profile mode not available in PyPi Installation!")
-        else:
-            curses.wrapper(main.main)
+        run_tui(args)
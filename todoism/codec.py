@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import struct
+from array import array
+
+import todoism.state as st
+import todoism.taskrecord as rec
+
+# Storage formats for tasks.json and categories.json:
+#   json     indented JSON, the historical format
+#   compact  JSON without indentation and whitespace
+#   binary   columnar task encoding, categories fall back to compact
+FORMATS = ("json", "compact", "binary")
+DEFAULT_FORMAT = "json"
+
+MAGIC = b"TODOISM\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+_SEPARATOR = "\x00"
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+_DONE = 1
+_FLAGGED = 2
+
+def sniff(data: bytes) -> str:
+    """Tell the format of encoded data"""
+    if data.startswith(MAGIC):
+        return "binary"
+    return "json" if data[1:2] == b"\n" else "compact"
+
+def sniff_file(file_path: str):
+    """Tell the format of a file, None if it does not exist"""
+    try:
+        with open(file_path, 'rb') as file:
+            return sniff(file.read(len(MAGIC)))
+    except FileNotFoundError:
+        return None
+
+def resolve_format(file_path: str) -> str:
+    """
+    The format to write file_path in, the storage_format setting if loaded,
+    otherwise the format the file already has so that a CLI call keeps it.
+    """
+    return st.storage_format or sniff_file(file_path) or DEFAULT_FORMAT
+
+def loads(data: bytes):
+    """Decode data in any format, raises ValueError if it is corrupt"""
+    if data.startswith(MAGIC):
+        return _decode_tasks(data)
+    return json.loads(data)
+
+def dumps(obj, storage_format: str, tasks=True) -> bytes:
+    """Encode obj, only task lists can use the binary format"""
+    if storage_format == "binary" and tasks:
+        return _encode_tasks(obj)
+    if storage_format == "json":
+        return json.dumps(obj, indent=4, default=rec.to_json).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=rec.to_json).encode('utf-8')
+
+def load(file_path: str):
+    with open(file_path, 'rb') as file:
+        return loads(file.read())
+
+def dump(obj, file_path: str, tasks=True):
+    """Replace file_path atomically, readers see either the old or the new content"""
+    data = dumps(obj, resolve_format(file_path), tasks)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _is_int64(value) -> bool:
+    return type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+
+def _is_plain_str(value) -> bool:
+    return type(value) is str and _SEPARATOR not in value
+
+def _is_regular(packed) -> bool:
+    """Whether a task fits the columns, anything else is stored as JSON"""
+    packed_uuid, task_id, description, due, created, done, flagged, category_id, _ = packed
+    return (type(packed_uuid) is bytes and _is_int64(task_id)
+            and _is_plain_str(description) and _is_plain_str(due) and _is_int64(created)
+            and type(done) is bool and type(flagged) is bool and _is_int64(category_id))
+
+def _int_column(values) -> bytes:
+    column = array('q', values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+def _read_int_column(data: bytes) -> array:
+    column = array('q')
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+def _str_column(values) -> bytes:
+    return _SEPARATOR.join(values).encode('utf-8')
+
+def _read_str_column(data: bytes, count: int) -> list:
+    return data.decode('utf-8').split(_SEPARATOR) if count else []
+
+def _encode_tasks(task_list) -> bytes:
+    regular = []
+    irregular = []
+    for i, task in enumerate(task_list):
+        if not isinstance(task, rec.Task):
+            task = rec.Task.from_dict(task)
+        packed = task.packed()
+        if _is_regular(packed):
+            regular.append(packed)
+        else:
+            irregular.append([i, task.to_dict()])
+
+    columns = [
+        b"".join(p[0] for p in regular),
+        _int_column(p[1] for p in regular),
+        _str_column(p[2] for p in regular),
+        _str_column(p[3] for p in regular),
+        _int_column(p[4] for p in regular),
+        bytes((_DONE if p[5] else 0) | (_FLAGGED if p[6] else 0) for p in regular),
+        _int_column(p[7] for p in regular),
+        _str_column(json.dumps(p[8], separators=(',', ':')) if p[8] else "" for p in regular),
+    ]
+    header = json.dumps({
+        "count": len(regular),
+        "columns": [len(column) for column in columns],
+        "irregular": irregular
+    }, separators=(',', ':'), default=rec.to_json).encode('utf-8')
+    return b"".join([MAGIC, _HEADER_LENGTH.pack(len(header)), header, *columns])
+
+def _decode_tasks(data: bytes) -> list:
+    try:
+        offset = len(MAGIC)
+        (header_length,) = _HEADER_LENGTH.unpack_from(data, offset)
+        offset += _HEADER_LENGTH.size
+        header = json.loads(data[offset:offset + header_length])
+        offset += header_length
+        columns = []
+        for length in header["columns"]:
+            columns.append(data[offset:offset + length])
+            offset += length
+        count = header["count"]
+
+        raw_uuids, raw_ids, raw_descriptions, raw_dues, raw_created, raw_marks, raw_categories, raw_extras = columns
+        uuids = [raw_uuids[i:i + 16] for i in range(0, 16 * count, 16)]
+        ids = _read_int_column(raw_ids)
+        descriptions = _read_str_column(raw_descriptions, count)
+        dues = _read_str_column(raw_dues, count)
+        created = _read_int_column(raw_created)
+        category_ids = _read_int_column(raw_categories)
+        extras = [json.loads(extra) if extra else None for extra in _read_str_column(raw_extras, count)]
+        if not (len(uuids) == len(ids) == len(descriptions) == len(dues) == len(created)
+                == len(raw_marks) == len(category_ids) == len(extras) == count):
+            raise ValueError("column lengths do not match")
+    except (struct.error, KeyError, UnicodeDecodeError) as e:
+        raise ValueError(f"corrupt binary task file: {e}") from e
+
+    task_list = [
+        rec.Task.from_packed(uuids[i], ids[i], descriptions[i], dues[i], created[i],
+                             bool(raw_marks[i] & _DONE), bool(raw_marks[i] & _FLAGGED),
+                             category_ids[i], extras[i])
+        for i in range(count)
+    ]
+    for index, task_dict in header["irregular"]:
+        task_list.insert(index, rec.Task.from_dict(task_dict))
+    return task_list
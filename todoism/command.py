@@ -1,8 +1,10 @@
+import sys
 import time
 import curses
 import webbrowser
 
 import todoism.task as tsk
+import todoism.archive as arc
 import todoism.edit as ed
 import todoism.print as pr
 import todoism.message as msg
@@ -13,6 +15,8 @@ import todoism.keycode as kc
 import todoism.category as cat
 import todoism.state as st
 import todoism.safe as sf
+import todoism.view as vw
+import todoism.update as up
 
 def purge(task_list, category_id=0):
     """
@@ -30,27 +34,24 @@ def purge(task_list, category_id=0):
         else:
             remained.append(t)
             
-    for t in newly_purged:
-        task_list = tsk.delete_task_by_uuid(task_list, t["uuid"])
+    task_list = tsk.delete_tasks_by_uuids(task_list, [t["uuid"] for t in newly_purged])
         
     tsk.reassign_task_ids(remained)
     st.current_cat_tasks = remained
-    purged_tasks = tsk.load_purged_tasks()
-    purged_tasks.extend(newly_purged)
-    tsk.save_tasks(purged_tasks, pref.get_purged_file_path())
+    arc.append_tasks(newly_purged)
     return task_list
 
 def handle_delete(task_list, task_id=0):
     task_id = st.current_task_id if task_id == 0 else task_id
-    task_uuid = st.current_cat_tasks[task_id - 1].get("uuid")
-    purged_tasks = tsk.load_purged_tasks()
-    purged_tasks.append(st.current_cat_tasks[task_id - 1])
-    tsk.save_tasks(purged_tasks, pref.get_purged_file_path())
+    task = st.current_cat_tasks[task_id - 1]
+    task_uuid = task.get("uuid")
+    arc.append_tasks([task])
     task_list = tsk.delete_task_by_uuid(task_list, task_uuid)
-    if st.searching:
-        st.current_cat_tasks = [task for task in st.current_cat_tasks if task["uuid"] != task_uuid]
-    else:
-        st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
+    if not vw.remove(task):
+        if st.searching:
+            st.current_cat_tasks = [t for t in st.current_cat_tasks if t["uuid"] != task_uuid]
+        else:
+            st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
     nv.post_deletion_update(len(task_list) + 1)
     return task_list
 
@@ -81,7 +82,6 @@ def execute_command(stdscr, command: str, task_list: list):
     elif command == "purge":
         original_cnt = st.task_cnt
         task_list = purge(task_list,st.current_category_id)
-        tsk.save_tasks(task_list)
         if len(st.current_cat_tasks) < original_cnt:
             st.current_task_id = 1
             st.current_task_row = 1
@@ -90,7 +90,6 @@ def execute_command(stdscr, command: str, task_list: list):
         return task_list, None
     elif command == ("purge all"):
         task_list = purge(task_list)
-        tsk.save_tasks(task_list)
         return task_list, None
     elif command.startswith("del"):
         parts = command.split()
@@ -167,6 +166,23 @@ def execute_command(stdscr, command: str, task_list: list):
                     webbrowser.open("https://github.com/Q1CHENL/todoism")
                     continue
 
+    elif command == "update":
+        pr.clear_all_except_outer_frames(stdscr)
+        stdscr.refresh()
+        success = up.update_todoism()
+        pr.clear_all_except_outer_frames(stdscr)
+        pr.print_msg(stdscr, msg.UPDATE_SUCCESS_MSG if success else msg.UPDATE_FAILURE_MSG)
+        stdscr.refresh()
+        if success:
+            stdscr.timeout(-1)
+            while stdscr.getch() != ord('q'):
+                pass
+            # The running process still has the old modules loaded
+            sys.exit(0)
+        time.sleep(2)
+        pr.clear_all_except_outer_frames(stdscr)
+        return task_list, None
+
     elif command == "pref":
         selection_index = 0
         open_pref_panel(stdscr, selection_index)
@@ -249,7 +265,7 @@ def execute_command(stdscr, command: str, task_list: list):
                     st.theme_color = colors[color_index]
                     pref.set_str_setting("selected_color", colors[color_index])
                     pr.print_pref_panel(stdscr, selection_index)
-                    curses.init_pair(thm.SELECTION_COLOR_PAIR_NUM, thm.get_color_code_by_str("black"), thm.get_theme_color_curses())
+                    thm.apply_theme()
                 elif ch == curses.KEY_UP:
                     selection_index -= 2
                 elif ch == curses.KEY_DOWN:
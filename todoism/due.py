@@ -1,33 +1,99 @@
 import re
-from datetime import datetime
+import time
+from datetime import datetime, date, timedelta
 from typing import Tuple
 
-def parse_due_date(description: str) -> Tuple[str, str]:
+# Parsed due strings, parsing doesn't depend on the current date so this is never cleared
+_parsed = {}
+# Due string -> the string shown in the task list, valid until _next_midnight
+_display = {}
+_today = None
+_next_midnight = 0.0
+
+# All supported due formats as one grammar for what is between the brackets.
+# When a description has several, the earlier alternative wins, just like
+# trying the formats one after another.
+_DUE_GRAMMAR = re.compile(r"""
+    (?P<datetime>\d{4}-\d{2}-\d{2}\ \d{2}:\d{2})        # [yyyy-mm-dd hh:mm]
+  | (?P<date>\d{4}-\d{1,2}-\d{1,2})                     # [yyyy-mm-dd]
+  | (?P<monthday_time>\d{2}-\d{2}\ \d{2}:\d{2})          # [mm-dd hh:mm]
+  | (?P<monthday>\d{1,2}-\d{1,2})                        # [mm-dd] or [dd-mm]
+  | (?P<time>\d{2}:\d{2})                                 # [hh:mm]
+  | (?P<relative>today|tomorrow|\+\d{1,3}[dw]             # [tomorrow], [+3d], [+2w]
+      |next\ (?:week|mon(?:day)?|tue(?:sday)?|wed(?:nesday)?|thu(?:rsday)?
+               |fri(?:day)?|sat(?:urday)?|sun(?:day)?))    # [next week], [next mon]
+    (?:\ (?P<relative_time>\d{2}:\d{2}))?                  # [tomorrow 18:00]
+""", re.VERBOSE | re.IGNORECASE)
+_PRIORITY = {
+    "datetime": 0, "date": 1, "monthday_time": 2, "monthday": 3, "time": 4,
+    "relative": 5, "relative_time": 5
+}
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+def _resolve_relative(text: str, today: date) -> str:
+    """Turn a relative form into a yyyy-mm-dd date"""
+    text = text.lower()
+    if text == "today":
+        days = 0
+    elif text == "tomorrow":
+        days = 1
+    elif text[0] == '+':
+        days = int(text[1:-1]) * (7 if text[-1] == 'w' else 1)
+    elif text == "next week":
+        days = 7
+    else:
+        # The next such weekday after today, a week ahead if it is today
+        days = (_WEEKDAYS.index(text[5:8]) - today.weekday() - 1) % 7 + 1
+    return (today + timedelta(days=days)).isoformat()
+
+def parse_due_date(description: str, today: date = None) -> Tuple[str, str]:
     """
     Parses a task description to extract a due date/time in the formats:
-    [yyyy-mm-dd hh:mm], [yyyy-mm-dd], [mm-dd], [hh:mm], [Tomorrow], [Next Week].
+    [yyyy-mm-dd hh:mm], [yyyy-mm-dd], [mm-dd], [hh:mm], and the relative
+    [today], [tomorrow], [+3d], [+2w], [next week], [next mon], optionally
+    followed by a time, e.g. [tomorrow 18:00]. Relative dates are stored as
+    yyyy-mm-dd counted from today.
     
     Returns:
     - A tuple (due_date, remaining_text), where:
         - due_date is the extracted date as a string, or an empty string if not found.
         - remaining_text is the input string with the date removed.
     """
-    patterns = [
-        r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2})\]',       # [yyyy-mm-dd hh:mm]
-        r'\[(\d{4}-\d{1,2}-\d{1,2})\]',               # [yyyy-mm-dd]
-        r'\[(\d{2}-\d{2} \d{2}:\d{2})\]',             # [mm-dd hh:mm]
-        r'\[(\d{1,2}-\d{1,2})\]',                     # [mm-dd] or [dd-mm]
-        r'\[(\d{2}:\d{2})\]',                         # [hh:mm]
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, description)
-        if match:
-            due_date = match.group(1) if match.groups() else match.group(0).strip("[]")
-            remaining_text = description[:match.start()] + description[match.end():]
-            return due_date, remaining_text.strip()
+    best = None
+    best_priority = len(_PRIORITY)
+    # One pass over the brackets, each candidate is matched against the grammar
+    start = description.find('[')
+    while start != -1:
+        end = description.find(']', start + 1)
+        if end == -1:
+            break
+        # The last '[' before the ']' opens the candidate
+        start = description.rfind('[', start, end)
+        match = _DUE_GRAMMAR.fullmatch(description, start + 1, end)
+        if match is not None:
+            priority = _PRIORITY[match.lastgroup]
+            if priority < best_priority:
+                best = match
+                best_priority = priority
+                if priority == 0:
+                    break
+        start = description.find('[', end + 1)
+    if best is None:
+        return "", description.strip()
 
-    return "", description.strip()
+    if best_priority == _PRIORITY["relative"]:
+        if today is None:
+            _check_day()
+            today = _today
+        relative, relative_time = best.group("relative", "relative_time")
+        due_date = _resolve_relative(relative, today)
+        if relative_time:
+            due_date += ' ' + relative_time
+    else:
+        due_date = best.group(best.lastgroup)
+    # Drop the brackets around the match as well
+    remaining_text = description[:best.start() - 1] + description[best.end() + 1:]
+    return due_date, remaining_text.strip()
 
 def add_due_key_if_missing(task_list: list):
     """
@@ -38,87 +104,106 @@ def add_due_key_if_missing(task_list: list):
         if "due" not in task:
             task["due"] = ""
 
-def is_due_today(date_str: str) -> bool:
+def _parse(date_str: str):
     """
-    Checks if a date string in any supported format represents today's date.
-    
-    Supported formats:
-    - yyyy-mm-dd hh:mm
-    - yyyy-mm-dd
-    - mm-dd hh:mm
-    - mm-dd or dd-mm
-    - hh:mm (implicitly today)
-    
-    Args:
-        date_str: The date string to check
-        
-    Returns:
-        True if the date represents today, False otherwise
+    Parse a due string once into (year, candidates, time): year is None if the
+    string has none, candidates are the (month, day) pairs it can mean, both
+    for an ambiguous mm-dd or dd-mm, and None for a time-only string that
+    always means today. time is the hh:mm suffix shown next to "Today" or "".
+    Returns False for strings that are never due today.
     """
-    if date_str == "":
-        return False
-        
-    # Get today's date components for comparison
-    today = datetime.now().date()
-    today_year = today.year
-    today_month = today.month
-    today_day = today.day
-    
     try:
         # Case 1: Time-only format (hh:mm)
         if len(date_str) == 5 and ":" in date_str:
-            return True  # Time-only implies today
+            return (None, None, date_str if date_str[2] == ':' else "")
             
         # Case 2: Full datetime (yyyy-mm-dd hh:mm)
         if len(date_str) == 16 and date_str[4] == '-' and date_str[7] == '-' and date_str[10] == ' ':
-            year = int(date_str[0:4])
-            month = int(date_str[5:7])
-            day = int(date_str[8:10])
-            return year == today_year and month == today_month and day == today_day
+            return (int(date_str[0:4]), {(int(date_str[5:7]), int(date_str[8:10]))}, date_str[-5:])
             
         # Case 3: Full date (yyyy-mm-dd)
         if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
-            year = int(date_str[0:4])
-            month = int(date_str[5:7])
-            day = int(date_str[8:10])
-            return year == today_year and month == today_month and day == today_day
+            return (int(date_str[0:4]), {(int(date_str[5:7]), int(date_str[8:10]))}, "")
             
         # Case 4: mm-dd hh:mm
         if len(date_str) >= 11 and "-" in date_str and ":" in date_str:
             parts = date_str.split(" ")[0].split("-")
-            month = int(parts[0])
-            day = int(parts[1])
-            return month == today_month and day == today_day
+            return (None, {(int(parts[0]), int(parts[1]))}, date_str[-5:] if len(date_str) in (11, 16) else "")
             
         # Case 5: Ambiguous mm-dd or dd-mm
         if "-" in date_str and len(date_str.split("-")) == 2:
-            parts = date_str.split("-")
+            first, second = (int(part) for part in date_str.split("-"))
+            candidates = set()
             # Try mm-dd interpretation
-            if 1 <= int(parts[0]) <= 12 and 1 <= int(parts[1]) <= 31:
-                if int(parts[0]) == today_month and int(parts[1]) == today_day:
-                    return True
+            if 1 <= first <= 12 and 1 <= second <= 31:
+                candidates.add((first, second))
             # Try dd-mm interpretation
-            if 1 <= int(parts[1]) <= 12 and 1 <= int(parts[0]) <= 31:
-                if int(parts[1]) == today_month and int(parts[0]) == today_day:
-                    return True
-            return False
+            if 1 <= second <= 12 and 1 <= first <= 31:
+                candidates.add((second, first))
+            return (None, candidates, "")
             
     except (ValueError, IndexError):
         # Handle any parsing errors
-        return False
+        pass
         
     return False
 
-def get_due_str(task):
-    due_str = task["due"]
-    due_len = len(due_str)
+def _get_parsed(date_str: str):
+    parsed = _parsed.get(date_str)
+    if parsed is None:
+        parsed = _parsed[date_str] = _parse(date_str)
+    return parsed
+
+def _check_day():
+    """Forget the memoized display strings once a day boundary passed"""
+    global _today, _next_midnight
+    if time.time() >= _next_midnight:
+        _today = date.today()
+        _next_midnight = datetime.combine(_today + timedelta(days=1), datetime.min.time()).timestamp()
+        _display.clear()
+
+def _is_today(parsed) -> bool:
+    if not parsed:
+        return False
+    year, candidates, _ = parsed
+    if candidates is None:
+        return True  # Time-only implies today
+    return year in (None, _today.year) and (_today.month, _today.day) in candidates
 
-    if is_due_today(due_str):
-        due_str = "Today"
-        if due_len == 16 or due_len == 11 or (due_len == 5 and task["due"][2] == ':'):
-            due_str += ' ' + task["due"][-5:]
+def is_due_today(date_str: str) -> bool:
+    """
+    Checks if a date string in any supported format represents today's date.
     
-    if due_str != "":
-        due_str = '[' + due_str + ']'
+    Supported formats:
+    - yyyy-mm-dd hh:mm
+    - yyyy-mm-dd
+    - mm-dd hh:mm
+    - mm-dd or dd-mm
+    - hh:mm (implicitly today)
     
-    return due_str
\ No newline at end of file
+    Args:
+        date_str: The date string to check
+        
+    Returns:
+        True if the date represents today, False otherwise
+    """
+    if date_str == "":
+        return False
+    _check_day()
+    return _is_today(_get_parsed(date_str))
+
+def get_due_str(task):
+    """The due date as shown in the task list, memoized per due string until midnight"""
+    due_str = task["due"]
+    if due_str == "":
+        return ""
+    _check_day()
+    display = _display.get(due_str)
+    if display is None:
+        parsed = _get_parsed(due_str)
+        if _is_today(parsed):
+            display = "[Today" + (' ' + parsed[2] if parsed[2] else "") + ']'
+        else:
+            display = '[' + due_str + ']'
+        _display[due_str] = display
+    return display
@@ -8,6 +8,8 @@ import todoism.category as cat
 import todoism.safe as sf
 import todoism.navigate as nv
 import todoism.due as due
+import todoism.view as vw
+import todoism.overlay as ov
 
 def move_by_word(text, current_pos, direction):
     """Move cursor by word in the specified direction
@@ -81,6 +83,7 @@ def highlight_selection(stdscr, task, text_key, y, selection_start_idx_in_text,
         if i - scroll_offset >= 0:  # Ensure we only render visible chars
             sf.safe_addstr(stdscr, y, screen_pos, task[text_key][i], attr)
 
+@ov.timed("wait")
 def edit(stdscr, entry, text_key, mode, initial_scroll=0):
     """
     A editing wrapper implemented using getch(). It delivers 
@@ -542,12 +545,14 @@ def handle_edit(stdscr, task_list):
         pr.edit_mode
     )
     if description == "":
-        task_uuid = st.current_cat_tasks[current_task_idx]["uuid"]
+        task = st.current_cat_tasks[current_task_idx]
+        task_uuid = task["uuid"]
         task_list = tsk.delete_task_by_uuid(task_list, task_uuid)
-        if st.searching:
-            st.current_cat_tasks = [task for task in st.current_cat_tasks if task["uuid"] != task_uuid]
-        else:
-            st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
+        if not vw.remove(task):
+            if st.searching:
+                st.current_cat_tasks = [t for t in st.current_cat_tasks if t["uuid"] != task_uuid]
+            else:
+                st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
         st.task_cnt = len(st.current_cat_tasks)
         nv.post_deletion_update(st.task_cnt + 1)
     else:
@@ -555,7 +560,7 @@ def handle_edit(stdscr, task_list):
         due_date, description = due.parse_due_date(description)
         st.current_cat_tasks[current_task_idx]["description"] = description
         st.current_cat_tasks[current_task_idx]["due"] = due_date
+        tsk.save_task(st.current_cat_tasks[current_task_idx])
         
-    tsk.save_tasks(task_list)
     return task_list
     
\ No newline at end of file
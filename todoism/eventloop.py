@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import signal
+import curses
+import selectors
+
+# The status bar shows hours and minutes, so the clock only needs to wake the loop once a minute
+CLOCK_INTERVAL = 60
+
+_selector = None
+# Self-pipe written by notify() from other threads and by the C signal handler through set_wakeup_fd
+_wakeup_read = None
+_wakeup_write = None
+_old_wakeup_fd = -1
+_old_winch_handler = None
+_next_tick = 0.0
+
+def start():
+    """
+    Set up the selector for the main loop: stdin, the clock, SIGWINCH and the
+    wakeup pipe. Without start() get_key() falls back to getch() with its timeout.
+    """
+    global _selector, _wakeup_read, _wakeup_write, _old_wakeup_fd, _old_winch_handler
+    if _selector is not None:
+        return
+    _wakeup_read, _wakeup_write = os.pipe()
+    os.set_blocking(_wakeup_read, False)
+    os.set_blocking(_wakeup_write, False)
+    _selector = selectors.DefaultSelector()
+    _selector.register(sys.stdin.fileno(), selectors.EVENT_READ, None)
+    _selector.register(_wakeup_read, selectors.EVENT_READ, None)
+    # Replaces ncurses' own handler, so the resize is applied in _on_resize()
+    _old_winch_handler = signal.signal(signal.SIGWINCH, _on_resize)
+    _old_wakeup_fd = signal.set_wakeup_fd(_wakeup_write, warn_on_full_buffer=False)
+    _schedule_tick()
+
+def stop():
+    """Restore the signal setup and close the selector"""
+    global _selector, _wakeup_read, _wakeup_write
+    if _selector is None:
+        return
+    signal.set_wakeup_fd(_old_wakeup_fd)
+    signal.signal(signal.SIGWINCH, _old_winch_handler if _old_winch_handler is not None else signal.SIG_DFL)
+    _selector.close()
+    os.close(_wakeup_read)
+    os.close(_wakeup_write)
+    _selector = _wakeup_read = _wakeup_write = None
+
+def register(fileobj, callback):
+    """Call callback() from the main loop whenever fileobj is readable, e.g. a file change notifier"""
+    if _selector is not None:
+        _selector.register(fileobj, selectors.EVENT_READ, callback)
+
+def unregister(fileobj):
+    if _selector is not None:
+        _selector.unregister(fileobj)
+
+def notify():
+    """Wake the main loop, safe to call from any thread"""
+    if _wakeup_write is not None:
+        try:
+            os.write(_wakeup_write, b"\0")
+        except (BlockingIOError, OSError):
+            # A full pipe wakes the loop just as well
+            pass
+
+def clock_ticked() -> bool:
+    """True once per minute boundary passed since the last call"""
+    if _selector is None or time.time() < _next_tick:
+        return _selector is None
+    _schedule_tick()
+    return True
+
+def get_key(stdscr, timeout_ms=500):
+    """
+    Block until there is input, the clock ticks, the terminal is resized or
+    notify() is called. Returns the key, or -1 if the loop was woken for
+    anything else. The getch() timeout is left at timeout_ms for the nested
+    getch() calls of key handlers, e.g. double backspace.
+    """
+    if _selector is None:
+        return stdscr.getch()
+    # Input ncurses already read, e.g. the rest of an unmatched escape sequence, or KEY_RESIZE
+    stdscr.timeout(0)
+    key = stdscr.getch()
+    stdscr.timeout(timeout_ms)
+    if key != -1 or not _wait():
+        return key
+    return stdscr.getch()
+
+def _wait() -> bool:
+    """Wait for the next event, True if stdin is readable"""
+    timeout = max(0.0, _next_tick - time.time())
+    has_input = False
+    for key, _ in _selector.select(timeout):
+        if key.fileobj == _wakeup_read:
+            _drain()
+        elif key.data is not None:
+            key.data()
+        else:
+            has_input = True
+    return has_input
+
+def _drain():
+    try:
+        while os.read(_wakeup_read, 512):
+            pass
+    except BlockingIOError:
+        pass
+
+def _schedule_tick():
+    global _next_tick
+    _next_tick = (int(time.time()) // CLOCK_INTERVAL + 1) * CLOCK_INTERVAL
+
+def _on_resize(signum, frame):
+    """Runs in the main thread between two bytecodes, resizeterm() also queues KEY_RESIZE"""
+    if curses.isendwin():
+        return
+    try:
+        columns, lines = os.get_terminal_size(sys.__stdout__.fileno())
+        curses.resizeterm(lines, columns)
+    except (OSError, ValueError, curses.error):
+        pass
@@ -0,0 +1,191 @@
+import os
+import json
+import fcntl
+import threading
+from contextlib import contextmanager
+
+import todoism.taskrecord as rec
+import todoism.codec as codec
+
+# Number of journal records after which the log is folded into the snapshot
+COMPACT_THRESHOLD = 512
+
+_record_counts = {}
+_compacting = set()
+_compacting_lock = threading.Lock()
+
+def get_journal_path(file_path: str) -> str:
+    return file_path + ".journal"
+
+def get_rotated_journal_path(file_path: str) -> str:
+    return file_path + ".journal.old"
+
+def get_lock_path(file_path: str) -> str:
+    return file_path + ".lock"
+
+def get_compact_lock_path(file_path: str) -> str:
+    return file_path + ".compact.lock"
+
+@contextmanager
+def lock(file_path: str):
+    """
+    Hold an exclusive flock guarding the snapshot and its journal.
+    The lock file is left in place, removing it would let a waiter and a
+    newcomer lock two different inodes at the same time.
+    """
+    with open(get_lock_path(file_path), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield
+
+def put_record(task) -> dict:
+    return {"op": "put", "task": task}
+
+def delete_record(task_uuids) -> dict:
+    return {"op": "delete", "uuids": list(task_uuids)}
+
+def append(file_path: str, record: dict):
+    """Append a single record to the journal of file_path"""
+    with lock(file_path):
+        write_record(file_path, record)
+
+def write_record(file_path: str, record: dict):
+    """Append a single record to the journal of file_path, the caller must hold the lock"""
+    line = json.dumps(record, separators=(',', ':'), default=rec.to_json) + '\n'
+    with open(get_journal_path(file_path), 'a') as journal:
+        journal.write(line)
+    _record_counts[file_path] = _record_counts.get(file_path, 0) + 1
+
+def read_records(journal_path: str, offset: int = 0) -> list:
+    """Read all complete records from a journal file, starting at a byte offset"""
+    records = []
+    try:
+        with open(journal_path, 'rb') as journal:
+            journal.seek(offset)
+            for line in journal:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-append, ignore it
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+def apply_records(task_list: list, records: list) -> list:
+    """
+    Apply journal records on top of a task list.
+    Records are idempotent, replaying one twice yields the same list.
+    """
+    if not records:
+        return task_list
+    tasks = {}
+    for task in task_list:
+        tasks[rec.task_uuid_key(task) or object()] = task
+    for record in records:
+        op = record.get("op")
+        if op == "put":
+            task = record["task"]
+            tasks[rec.task_uuid_key(task)] = task
+        elif op == "delete":
+            for task_uuid in record["uuids"]:
+                tasks.pop(rec.uuid_key(task_uuid), None)
+    return list(tasks.values())
+
+def replay(task_list: list, file_path: str) -> list:
+    """Replay the rotated and the live journal of file_path over task_list"""
+    records = read_records(get_rotated_journal_path(file_path))
+    records.extend(read_records(get_journal_path(file_path)))
+    _record_counts[file_path] = len(records)
+    return apply_records(task_list, records)
+
+def discard(file_path: str):
+    """Drop the journals of file_path, the caller must hold the lock"""
+    for path in (get_journal_path(file_path), get_rotated_journal_path(file_path)):
+        if os.path.exists(path):
+            os.remove(path)
+    _record_counts[file_path] = 0
+
+def needs_compaction(file_path: str) -> bool:
+    return _record_counts.get(file_path, 0) >= COMPACT_THRESHOLD
+
+def get_version(file_path: str) -> tuple:
+    """
+    Changes whenever another writer replaced the snapshot or added journal
+    records, the caller must hold the lock
+    """
+    journal_path = get_journal_path(file_path)
+    return (_signature(file_path), _signature(get_rotated_journal_path(file_path)),
+            os.path.getsize(journal_path) if os.path.exists(journal_path) else 0)
+
+def _signature(file_path: str):
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _read_snapshot(file_path: str) -> list:
+    try:
+        return codec.load(file_path)
+    except (FileNotFoundError, ValueError):
+        return []
+
+def compact(file_path: str) -> bool:
+    """
+    Fold the journal into the snapshot.
+    The journal is rotated under the lock so appends can go on while the
+    snapshot is rebuilt, the new snapshot is only installed if no full save
+    replaced the old one in the meantime.
+    """
+    # Only one compaction at a time over all processes, they share the temporary file.
+    # The flock goes away with a process that dies halfway.
+    with open(get_compact_lock_path(file_path), 'a') as compact_lock:
+        try:
+            fcntl.flock(compact_lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return _compact(file_path)
+
+def _compact(file_path: str) -> bool:
+    journal_path = get_journal_path(file_path)
+    rotated_path = get_rotated_journal_path(file_path)
+    with lock(file_path):
+        if not os.path.exists(rotated_path):
+            if not os.path.exists(journal_path):
+                return False
+            os.replace(journal_path, rotated_path)
+        _record_counts[file_path] = 0
+        signature = _signature(file_path)
+
+    task_list = apply_records(_read_snapshot(file_path), read_records(rotated_path))
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(codec.dumps(task_list, codec.resolve_format(file_path)))
+
+    with lock(file_path):
+        if _signature(file_path) != signature:
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, file_path)
+        if os.path.exists(rotated_path):
+            os.remove(rotated_path)
+    return True
+
+def compact_async(file_path: str, on_compacted=None):
+    """Run compact() in a daemon thread, at most one per file"""
+    with _compacting_lock:
+        if file_path in _compacting:
+            return
+        _compacting.add(file_path)
+
+    def worker():
+        try:
+            if compact(file_path) and on_compacted:
+                on_compacted()
+        except OSError:
+            pass
+        finally:
+            with _compacting_lock:
+                _compacting.discard(file_path)
+
+    threading.Thread(target=worker, daemon=True).start()
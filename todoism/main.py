@@ -17,6 +17,10 @@ import todoism.search as srch
 import todoism.safe as sf
 import todoism.due as due 
 import todoism.update as up
+import todoism.view as vw
+import todoism.eventloop as ev
+import todoism.watch as wt
+import todoism.overlay as ov
 
 def first_run():
     """Show welcome message if this is the first run of this version"""
@@ -46,6 +50,7 @@ def _quit_search(stdscr, task_list):
     pr.clear_bottom_bar_except_status(stdscr)
     _restore_state(task_list)
 
+@ov.timed("wait")
 def _handle_command_input(stdscr):
     curses.echo()
     curses.curs_set(1)
@@ -61,7 +66,7 @@ def _handle_command_input(stdscr):
     
 def _restore_task_panel(task_list, categories):
     _restore_state(task_list)
-    _sort_by_flagged_done_tag(categories)
+    vw.rebuild(categories)
 
 def _restore_state(task_list):    
     st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
@@ -71,42 +76,47 @@ def _restore_state(task_list):
     st.start_task_id = 1 if st.task_cnt > 0 else 0
     st.end_task_id = min(st.latest_max_capacity, st.task_cnt)
 
-def _window_resized():
-    return st.old_max_x != st.latest_max_x or st.latest_max_y != st.old_max_y
+def _in_current_category(task) -> bool:
+    return st.current_category_id == 0 or task["category_id"] == st.current_category_id
 
-def _sort_by_tag(categories):
-    marked = []
-    not_marked = []
-    for i, task in enumerate(st.current_cat_tasks):
-        if _task_marked(task):
-            marked.append(task)
+def _update_view(added, changed, deleted) -> bool:
+    """Apply changed tasks to the sorted view, False if it has to be rebuilt instead"""
+    for task in deleted:
+        if vw.contains(task) and not vw.remove(task):
+            return False
+    for task in changed:
+        if vw.contains(task):
+            updated = vw.reposition(task) if _in_current_category(task) else vw.remove(task)
         else:
-            not_marked.append(task)
-    not_marked_sorted_by_tag = []
-    for c in categories:
-        for task in not_marked: 
-            if c["id"] == task["category_id"]:
-                    not_marked_sorted_by_tag.append(task)
-    st.current_cat_tasks = marked + not_marked_sorted_by_tag
-    
-def _sort_by_flagged_done_tag(categories):
-    if st.sort_by_done:
-        st.current_cat_tasks = tsk.sort(st.current_cat_tasks, "done")
-    if st.sort_by_flagged:
-        st.current_cat_tasks = tsk.sort(st.current_cat_tasks, "flagged")
-    _sort_by_tag(categories)
+            updated = not _in_current_category(task) or vw.insert(task)
+        if not updated:
+            return False
+    for task in added:
+        if _in_current_category(task) and not vw.insert(task):
+            return False
+    return True
 
-def _task_marked(task):
-    if st.sort_by_done and st.sort_by_flagged:
-        return task["done"] or task["flagged"]
-    elif st.sort_by_done:
-        return task["done"]
-    elif st.sort_by_flagged:
-        return task["flagged"]
-    else:
+def _apply_external_changes(task_list, categories) -> bool:
+    """Merge tasks other processes stored into task_list and the view, the selected task stays selected"""
+    selected = None
+    if 0 < st.current_task_id <= len(st.current_cat_tasks):
+        selected = st.current_cat_tasks[st.current_task_id - 1]
+    added, changed, deleted = tsk.apply_stored_changes(task_list)
+    if not (added or changed or deleted):
         return False
-    
-def main(stdscr):
+    if st.searching:
+        deleted_ids = {id(task) for task in deleted}
+        st.current_cat_tasks = [task for task in st.current_cat_tasks if id(task) not in deleted_ids]
+    elif not _update_view(added, changed, deleted):
+        st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
+        vw.rebuild(categories)
+    nv.reselect_task(selected, st.current_task_row)
+    return True
+
+def _window_resized():
+    return st.old_max_x != st.latest_max_x or st.latest_max_y != st.old_max_y
+
+def _main(stdscr):
     stdscr.keypad(True)  # enable e.g arrow keys
     stdscr.scrollok(True)
     curses.curs_set(0)
@@ -115,6 +125,8 @@ def main(stdscr):
     stdscr.clear()
     stdscr.refresh()
     curses.start_color()
+    pref.update_preferences()    
+    pref.load_preferences()
     thm.setup_color_pairs()
     stdscr.bkgd(' ', thm.get_bkg_color_pair())
     
@@ -122,10 +134,15 @@ def main(stdscr):
         if not kc.record_key_codes(stdscr):
             return
     kc.setup_keycodes()
+    
+    # Keys whose handling only changes what print_whole_view() draws,
+    # any other key may draw outside of it and invalidates the last frame
+    frame_keeping_keys = {
+        curses.KEY_UP, curses.KEY_DOWN, curses.KEY_MOUSE, kc.TAB,
+        ord('d'), ord(' '), ord('f'), kc.ALT_LEFT, kc.ALT_RIGHT
+    }
 
     tsk.repair_tasks()
-    pref.update_preferences()    
-    pref.load_preferences()
     
     # Enable mouse support
     curses.mousemask(curses.ALL_MOUSE_EVENTS | curses.REPORT_MOUSE_POSITION)
@@ -140,7 +157,10 @@ def main(stdscr):
     # Set a timeout for getch() to make it non-blocking (500ms)
     # 500ms makes sure double backspaces work
     stdscr.timeout(500)
-    last_time_update = time.time()
+    # The main loop itself only wakes up for input, resizes, the clock and notifications
+    ev.start()
+    # Tasks added or changed by other processes, e.g. todoism add from a script
+    wt.start(tsk.get_task_file_paths())
     
     should_repaint = True
     task_scroll_offset = 0
@@ -166,30 +186,8 @@ def main(stdscr):
     sidebar_scroller = nv.SidebarScroller(len(categories), st.latest_max_capacity)
     old_cat_id = st.current_category_id
     
-    update_available = up.check_for_updates()
-    if update_available:
-        pr.print_outer_frame(stdscr)
-        pr.print_msg(stdscr, msg.NEW_VERSION_MSG)
-        
-        stdscr.timeout(-1)
-        while True:
-            key = stdscr.getch()
-            if key == kc.ENTER or key == curses.KEY_ENTER:
-                break
-            elif key == ord('u'):
-                success = up.update_todoism()
-                pr.clear_all_except_outer_frames(stdscr)
-                pr.print_msg(stdscr, msg.UPDATE_SUCCESS_MSG if success else msg.UPDATE_FAILURE_MSG)
-                stdscr.refresh()
-                if success:
-                    while True:
-                        key = stdscr.getch()
-                        if key == ord('q'):
-                            return
-                else:
-                    time.sleep(2)
-                    break
-        stdscr.timeout(500)
+    # Runs in the background, the result shows up in the status bar
+    up.start_update_check()
     
     if first_run():
         pr.print_outer_frame(stdscr)
@@ -204,8 +202,7 @@ def main(stdscr):
             old_cat_id = st.current_category_id
             st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
         
-        _sort_by_flagged_done_tag(categories)
-        tsk.reassign_task_ids(st.current_cat_tasks)
+        vw.sync(categories)
         
         st.task_cnt = len(st.current_cat_tasks)
         st.cat_cnt = len(categories)
@@ -302,13 +299,20 @@ def main(stdscr):
         if _window_resized():
             should_repaint = True
             stdscr.clear()
+            pr.invalidate_frame()
             continue
         
-        # Check if we need to update the time (every second)
-        current_time = time.time()
-        if current_time - last_time_update >= 2.0:
+        if wt.take_changed() and _apply_external_changes(task_list, categories):
+            should_repaint = True
+        
+        latest_version = up.poll_update()
+        if latest_version:
+            st.latest_version = latest_version
+            pr.print_status_bar(stdscr)
+        
+        # Update the time when the minute changes
+        if ev.clock_ticked():
             pr.print_status_bar(stdscr)
-            last_time_update = current_time
             
         if should_repaint:
             if st.searching:
@@ -326,11 +330,19 @@ def main(stdscr):
             should_repaint = False
             stdscr.refresh()
             
-        # Wait for user input
-        key = stdscr.getch()
+        # Show what handling the last key cost, the search hint uses the bottom bar itself
+        if ov.end_frame() and not st.searching:
+            pr.print_dev_overlay(stdscr)
+            
+        # Wait for user input or any other event
+        key = ev.get_key(stdscr)
                 
         if key == -1:
             continue
+        ov.begin_frame()
+        
+        if key not in frame_keeping_keys:
+            pr.invalidate_frame()
             
         if key == kc.TAB:
             if st.searching:
@@ -481,8 +493,7 @@ def main(stdscr):
                         st.end_task_id = min(st.latest_max_capacity, st.task_cnt)
                     
                     pr.clear_task_panel(stdscr)
-                    _sort_by_flagged_done_tag(categories)
-                    tsk.reassign_task_ids(st.current_cat_tasks)
+                    vw.rebuild(categories)
                     pr.print_task_entries(stdscr, cat.SIDEBAR_WIDTH)
                     sf.safe_move(stdscr, st.latest_max_y - 2, len(query) + 2)
                     stdscr.refresh()
@@ -601,21 +612,10 @@ def main(stdscr):
                     if k == curses.KEY_BACKSPACE or k == kc.BACKSPACE:
                         
                         # Handle tasks in this category
-                        task_list = [task for task in task_list if task.get("category_id", 0) != st.current_category_id]
-                        tsk.reassign_task_ids(task_list)
-                        tsk.save_tasks(task_list)
+                        deleted_uuids = [task["uuid"] for task in task_list if task.get("category_id", 0) == st.current_category_id]
                         cat.delete_category(st.current_category_id)
                         categories = cat.reassign_category_ids()
-                        
-                        for task in task_list:
-                            if task["category_id"] > st.current_category_id:
-                                task["category_id"] -= 1
-                        tsk.save_tasks(task_list)
-                        
-                        # A category in the middle might be deleted
-                        if len(categories) > 1:
-                            # We need to reload tasks after renumbering to ensure proper associations
-                            task_list = tsk.load_tasks()
+                        task_list = tsk.delete_tasks_by_uuids(task_list, deleted_uuids, st.current_category_id)
                         
                         sidebar_scroller.update_total(len(categories))
                         
@@ -649,7 +649,7 @@ def main(stdscr):
             if key == ord('a'):
                 if st.searching:
                     continue
-                if st.task_cnt == tsk.MAX_TASK_COUNT:
+                if st.max_task_count and len(task_list) >= st.max_task_count:
                     pr.print_msg(stdscr, msg.LIMIT_MSG)
                     time.sleep(1.2)
                     continue
@@ -691,7 +691,8 @@ def main(stdscr):
                         task_list = tsk.add_new_task(
                             task_list, new_id, new_task_description, False, new_task["category_id"], due_date)
                         st.task_cnt = st.task_cnt + 1
-                        st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
+                        if not vw.insert(task_list[-1]):
+                            st.current_cat_tasks = tsk.get_tasks_by_category_id(task_list, st.current_category_id)
                         
                         if st.task_cnt == 1:
                             st.start_task_id = 1
@@ -760,7 +761,6 @@ def main(stdscr):
                 if second_key == curses.KEY_BACKSPACE or second_key == kc.BACKSPACE:
                     if len(st.current_cat_tasks) > 0:
                         task_list = cmd.handle_delete(task_list)
-                    tsk.save_tasks(task_list)
                     should_repaint = True
                     
             elif key == kc.ALT_LEFT:
@@ -781,6 +781,15 @@ def main(stdscr):
                     task_scroll_offset = 0
                     should_repaint = True
 
+def main(stdscr):
+    try:
+        _main(stdscr)
+    finally:
+        # The signal handlers, the wakeup pipe and the file watcher must not outlive curses, e.g. with --profile.
+        # The watcher goes first, it unregisters from the event loop's selector
+        wt.stop()
+        ev.stop()
+
 def run():
     import todoism.cli as cli
     cli.run()
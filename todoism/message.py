@@ -29,11 +29,12 @@ HELP_MSG = '''
 │   :purge all - Purge all done tasks          - Click on done/flag: Toggle status             │
 │   :keycode record - record keycodes          - Click on blank area: Toggle focus             │
 │   :keycode show - show keycodes              - Wheel scroll: Navigate through tasks/cats     │
+│   :update - Install the newest version                                                       │
 │                                                                                              │
 │   To add due date to a task:                                                                 │
 │   Add [<due date>] at the end of the task    - [mm-dd hh:mm]  - [yyyy-mm-dd]  - [hh:mm]      │
 │   Supported formats:                         - [mm-dd] or [dd-mm]  - [yyyy-mm-dd hh:mm]      │
-│                                                                                              │
+│                                              - [tomorrow]  - [+3d]  - [next mon]             │
 └──────────────────────────────────────────────────────────────────────────────────────────────┘
 '''
 
@@ -74,8 +75,8 @@ EMPTY_MSG = '''
 
 LIMIT_MSG = '''
 ┌────────────────────────────────────────┐
-│  You already have 1024 tasks in hand.  │
-│  Maybe try to deal with them first :)  │
+│  You reached max_task_count from your  │
+│  settings, try to deal with some :)    │
 └────────────────────────────────────────┘
 '''
 
@@ -325,15 +326,6 @@ KEYCODE_RESTART_MSG = '''
 └───────────────────────────────────────────────────┘
 '''
 
-NEW_VERSION_MSG = '''
-┌───────────────────────────────────────────────────┐
-│ New version of todoism is available!              │
-│                                                   │
-│ Press 'u' to update now                           │
-│ Press Enter to proceed without updating           │
-└───────────────────────────────────────────────────┘
-'''
-
 WELCOME_MSG = '''
 ┌───────────────────────────────────────────────────────────┐
 │ ████████╗ ██████╗ ██████╗  ██████╗ ██╗███████╗███╗   ███╗ │
@@ -171,6 +171,28 @@ def post_deletion_update(prev_task_cnt):
             st.current_task_row = st.current_task_row - 1
             st.current_task_id = st.current_task_id - 1
 
+def reselect_task(task, row):
+    """
+    Select task again after tasks were added or removed around it, on the same row if possible.
+    If task is gone the cursor stays where it was.
+    """
+    st.task_cnt = len(st.current_cat_tasks)
+    if st.task_cnt == 0:
+        st.current_task_id = st.current_task_row = st.start_task_id = st.end_task_id = 0
+        return
+    # Tasks of the sorted view carry their position as id, search results don't
+    if task is not None and 0 < task["id"] <= st.task_cnt and st.current_cat_tasks[task["id"] - 1] is task:
+        st.current_task_id = task["id"]
+    else:
+        position = next((i + 1 for i, t in enumerate(st.current_cat_tasks) if t is task), 0)
+        st.current_task_id = position or min(max(st.current_task_id, 1), st.task_cnt)
+    capacity = max(st.latest_max_capacity, 1)
+    row = min(max(row, 1), capacity, st.current_task_id)
+    # Don't leave rows empty at the bottom while there are tasks above
+    st.start_task_id = max(1, min(st.current_task_id - row + 1, st.task_cnt - capacity + 1))
+    st.end_task_id = min(st.task_cnt, st.start_task_id + capacity - 1)
+    st.current_task_row = st.current_task_id - st.start_task_id + 1
+
 def _is_view_fully_packed():
     """indicates whether the current view is completely filled with tasks"""
     return st.end_task_id - st.start_task_id + 1 >= st.latest_max_capacity
\ No newline at end of file
@@ -0,0 +1,97 @@
+import sys
+import time
+import functools
+
+# Dev overlay, enabled with --overlay. While disabled every hook returns right away.
+# A frame is the handling of one keystroke, from getting the key until the main
+# loop waits again. Time spent in a section does not include the sections it calls,
+# so input is the key handling without the sort, render and storage it triggered.
+# Keys that open an editor or a prompt end their frame when it closes, the time
+# spent typing there goes to the hidden wait section.
+SECTIONS = ("sort", "render", "storage", "input")
+COUNTERS = ("open", "load", "save")
+# Short names, the overlay shares the bottom bar with the status
+_LABELS = {"sort": "sort", "render": "rend", "storage": "stor", "input": "in"}
+
+enabled = False
+_audit_hook_added = False
+_in_frame = False
+_times = dict.fromkeys(SECTIONS + ("wait",), 0.0)
+_counts = dict.fromkeys(COUNTERS, 0)
+_last_times = dict(_times)
+_last_counts = dict(_counts)
+# Open sections as [name, start], only the innermost one is running
+_stack = []
+
+def enable():
+    global enabled, _audit_hook_added
+    enabled = True
+    if not _audit_hook_added:
+        # open() and os.open() raise the open audit event, wherever they are called
+        sys.addaudithook(_on_audit_event)
+        _audit_hook_added = True
+
+def _on_audit_event(event, args):
+    if event == "open":
+        _counts["open"] += 1
+
+def begin(section):
+    now = time.perf_counter()
+    if _stack:
+        _times[_stack[-1][0]] += now - _stack[-1][1]
+    _stack.append([section, now])
+
+def end():
+    now = time.perf_counter()
+    section, start = _stack.pop()
+    _times[section] += now - start
+    if _stack:
+        _stack[-1][1] = now
+
+def timed(section, counter=None):
+    """Decorator adding the function's time to section, and counting its calls under counter"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            if counter is not None:
+                _counts[counter] += 1
+            begin(section)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end()
+        return wrapper
+    return decorate
+
+def begin_frame():
+    """A key was read, start timing its handling from zero"""
+    global _in_frame
+    if not enabled:
+        return
+    _stack.clear()
+    for section in _times:
+        _times[section] = 0.0
+    for counter in COUNTERS:
+        _counts[counter] = 0
+    _in_frame = True
+    begin("input")
+
+def end_frame() -> bool:
+    """The main loop is about to wait again, True if a frame ended and the overlay has to be redrawn"""
+    global _in_frame, _last_times, _last_counts
+    if not _in_frame:
+        return False
+    while _stack:
+        end()
+    _last_times = dict(_times)
+    _last_counts = dict(_counts)
+    _in_frame = False
+    return True
+
+def get_text() -> str:
+    """Timings in milliseconds and counters of the last frame"""
+    times = " ".join(f"{_LABELS[section]} {_last_times[section] * 1000:.1f}" for section in SECTIONS)
+    counts = " ".join(f"{counter} {_last_counts[counter]}" for counter in COUNTERS)
+    return f"{times}ms {counts}"
@@ -2,6 +2,8 @@ import os
 import json
 
 import todoism.state as st
+import todoism.codec as codec
+import todoism.overlay as ov
 
 HOME_DIR = os.path.expanduser("~")
 CONFIG_DIR = os.path.join(HOME_DIR, ".todoism")
@@ -10,8 +12,11 @@ os.makedirs(CONFIG_DIR, exist_ok=True)
 
 SETTINGS_PATH = os.path.join(CONFIG_DIR, "settings.json")
 PURGED_FILE_PATH = os.path.join(CONFIG_DIR, "purged.json")
+PURGED_DIR_PATH = os.path.join(CONFIG_DIR, "purged")
 TASKS_FILE_PATH = os.path.join(CONFIG_DIR, "tasks.json")
 CATEGORIES_FILE_PATH = os.path.join(CONFIG_DIR, "categories.json")
+DATABASE_FILE_PATH = os.path.join(CONFIG_DIR, "todoism.db")
+BACKUP_DIR_PATH = os.path.join(CONFIG_DIR, "backups")
 
 default_settings = {
     "date_format": "Y-M-D",
@@ -21,6 +26,9 @@ default_settings = {
     "sort_by_flagged": False,
     "sort_by_done": False,
     "bold_text": False,
+    "max_task_count": 0,
+    "storage_format": "json",
+    "storage_backend": "file",
     "ctrl+left": 0,
     "ctrl+right": 0,
     "ctrl+shift+left": 0,
@@ -28,6 +36,7 @@ default_settings = {
     "alt+left": 0,
     "alt+right": 0,
     "last_update_check": 0,
+    "latest_version": None,
     "last_run_version": None
 }
 
@@ -37,12 +46,22 @@ def get_tasks_file_path() -> str:
 def get_categories_file_path() -> str:
     return os.path.join(ROOT_DIR, "test/.todoism/categories.json") if st.dev_mode else CATEGORIES_FILE_PATH
 
+def get_database_file_path() -> str:
+    return os.path.join(ROOT_DIR, "test/.todoism/todoism.db") if st.dev_mode else DATABASE_FILE_PATH
+
 def get_purged_file_path() -> str:
     return os.path.join(ROOT_DIR, "test/.todoism/purged.json") if st.dev_mode else PURGED_FILE_PATH
 
+def get_purged_dir_path() -> str:
+    return os.path.join(ROOT_DIR, "test/.todoism/purged") if st.dev_mode else PURGED_DIR_PATH
+
+def get_backup_dir_path() -> str:
+    return os.path.join(ROOT_DIR, "test/.todoism/backups") if st.dev_mode else BACKUP_DIR_PATH
+
 def get_settings_file_path() -> str:
     return os.path.join(ROOT_DIR, "test/.todoism/settings.json") if st.dev_mode else SETTINGS_PATH
 
+@ov.timed("storage", "save")
 def setup_default_settings():
     """
     setup default settings if no settings.json were found
@@ -52,6 +71,7 @@ def setup_default_settings():
         json.dump(default_settings, file, indent=4)
     return default_settings
 
+@ov.timed("storage", "load")
 def load_preferences():
     """
     Load settings from the settings.json file.
@@ -60,16 +80,30 @@ def load_preferences():
     try:
         with open(get_settings_file_path(), 'r') as file:
             preferences = json.load(file)
-            st.theme_color = preferences.get("selected_color", "blue")
-            st.date_format = preferences.get("date_format", "Y-M-D")
-            st.sort_by_done = preferences.get("sort_by_done", False)
-            st.sort_by_flagged = preferences.get("sort_by_flagged", False)
-            st.tag = preferences.get("tag", True)
-            st.strikethrough = preferences.get("strikethrough", True)
-            st.bold_text = preferences.get("bold_text", False)
     except (FileNotFoundError, json.JSONDecodeError):
-        setup_default_settings()
+        preferences = setup_default_settings()
+    st.theme_color = preferences.get("selected_color", "blue")
+    st.date_format = preferences.get("date_format", "Y-M-D")
+    st.sort_by_done = preferences.get("sort_by_done", False)
+    st.sort_by_flagged = preferences.get("sort_by_flagged", False)
+    st.tag = preferences.get("tag", True)
+    st.strikethrough = preferences.get("strikethrough", True)
+    st.bold_text = preferences.get("bold_text", False)
+    st.max_task_count = preferences.get("max_task_count", 0)
+    storage_format = preferences.get("storage_format", "json")
+    st.storage_format = storage_format if storage_format in codec.FORMATS else "json"
+    st.storage_backend = preferences.get("storage_backend", "file")
+
+@ov.timed("storage", "load")
+def get_setting(setting_name: str, default=None):
+    """Read a single setting without loading all preferences, e.g. for CLI commands"""
+    try:
+        with open(get_settings_file_path(), 'r') as file:
+            return json.load(file).get(setting_name, default)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
 
+@ov.timed("storage", "load")
 def update_preferences():
     """
     Update settings file with new entries when program is updated.
@@ -102,6 +136,21 @@ def update_preferences():
         # If anything goes wrong, return default settings
         return setup_default_settings()
         
+@ov.timed("storage", "save")
+def set_setting(setting_name: str, value):
+    """Set a setting of any JSON type in the settings file."""
+    try:
+        with open(get_settings_file_path(), 'r+') as settings_file:
+            settings = json.load(settings_file)
+            settings[setting_name] = value
+            settings_file.seek(0)
+            json.dump(settings, settings_file, indent=4)
+            settings_file.truncate()
+            
+    except (FileNotFoundError, json.JSONDecodeError):
+        setup_default_settings()
+
+@ov.timed("storage", "save")
 def set_bool_setting(setting_name: str, value: bool):
     """Set a boolean setting in the settings file."""
     try:
@@ -115,6 +164,7 @@ def set_bool_setting(setting_name: str, value: bool):
     except FileNotFoundError:
         setup_default_settings()
         
+@ov.timed("storage", "save")
 def set_str_setting(setting_name: str, value: str):
     """Set a string setting in the settings file."""
     try:
@@ -9,30 +9,63 @@ import todoism.state as st
 import todoism.task as tsk
 import todoism.safe as sf
 import todoism.due as due
+import todoism.overlay as ov
 
 view_mode = 0
 add_mode  = 1
 edit_mode = 2
 
-def print_version():
-    print("todoism v1.21.9")
+# Model of the last drawn frame, screen row -> drawn segments
+# A segment is (y, x, text, attr), x is None for text appended at the cursor
+_task_rows = {}
+_sidebar_rows = {}
+_frame_valid = False
 
 def print_q_to_close(stdscr, page):
     hint = f"Press 'q' to close {page}"
     hint_pos_x = (st.latest_max_x - len(hint)) // 2 
     sf.safe_addstr(stdscr, st.latest_max_y - 2, hint_pos_x, hint, thm.get_bkg_color_pair())
 
+def invalidate_frame():
+    """Forget the last drawn frame, the next print_whole_view() redraws everything"""
+    global _frame_valid
+    _task_rows.clear()
+    _sidebar_rows.clear()
+    _frame_valid = False
+
+def _emit(stdscr, segments):
+    for y, x, text, attr in segments:
+        if not text:
+            continue
+        if x is None:
+            sf.safe_appendstr(stdscr, text, attr)
+        else:
+            sf.safe_addstr(stdscr, y, x, text, attr)
+
 def clear_all_except_outer_frames(stdscr):
+    invalidate_frame()
     for y in range(1, st.latest_max_y - 1):
         sf.safe_addstr(stdscr, y, 1, ' ' * (st.latest_max_x - 2), thm.get_bkg_color_pair())
 
 def clear_sidebar_area(stdscr):
+    global _frame_valid
+    _sidebar_rows.clear()
+    _frame_valid = False
     for y in range(1, st.latest_max_y - 3):
-        sf.safe_addstr(stdscr, y, 1, ' ' * (cat.SIDEBAR_WIDTH - 2), thm.get_bkg_color_pair())
+        clear_sidebar_row(stdscr, y)
+
+def clear_sidebar_row(stdscr, y):
+    sf.safe_addstr(stdscr, y, 1, ' ' * (cat.SIDEBAR_WIDTH - 2), thm.get_bkg_color_pair())
 
 def clear_task_panel(stdscr):
+    global _frame_valid
+    _task_rows.clear()
+    _frame_valid = False
     for y in range(1, st.latest_max_y - 3):    
-        sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH, ' ' * (st.latest_max_x - cat.SIDEBAR_WIDTH - 1), thm.get_bkg_color_pair())
+        clear_task_row(stdscr, y)
+
+def clear_task_row(stdscr, y):
+    sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH, ' ' * (st.latest_max_x - cat.SIDEBAR_WIDTH - 1), thm.get_bkg_color_pair())
 
 def clear_status(stdscr):
     sf.safe_addstr(stdscr, st.latest_max_y - 2, st.latest_max_x - 35, ' ' * 34, thm.get_bkg_color_pair())
@@ -98,23 +131,28 @@ def print_task_symbols(stdscr, task, y, is_selected=False):
         y: The row position
         is_selected: Whether the task is selected
     """
+    _emit(stdscr, _task_symbol_segments(task, y, is_selected))
+
+def _task_symbol_segments(task, y, is_selected=False) -> list:
     attr_bkg = curses.color_pair(thm.SELECTION_COLOR_PAIR_NUM)
     attr_space = attr_bkg if is_selected else 0
     attr_red = thm.get_color_pair_by_str("red")
     attr_green = thm.get_color_pair_by_str("green")
     
+    segments = []
     if task.get("flagged", False):
-        sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH + 3, '⚑', attr_bkg if is_selected else attr_red)
+        segments.append((y, cat.SIDEBAR_WIDTH + 3, '⚑', attr_bkg if is_selected else attr_red))
     else:
-        sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH + 3, ' ', attr_space)
+        segments.append((y, cat.SIDEBAR_WIDTH + 3, ' ', attr_space))
     # Add space between flag and status
-    sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH + 3 + 1, ' ', attr_space)
+    segments.append((y, cat.SIDEBAR_WIDTH + 3 + 1, ' ', attr_space))
 
     if task.get("done", False):
-        sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH + 5, '✓', attr_bkg if is_selected else attr_green)
+        segments.append((y, cat.SIDEBAR_WIDTH + 5, '✓', attr_bkg if is_selected else attr_green))
     else:
-        sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH + 5, ' ', attr_space)
-    sf.safe_addstr(stdscr, y, cat.SIDEBAR_WIDTH + 5 + 1, ' ', attr_space)
+        segments.append((y, cat.SIDEBAR_WIDTH + 5, ' ', attr_space))
+    segments.append((y, cat.SIDEBAR_WIDTH + 5 + 1, ' ', attr_space))
+    return segments
     
 def print_editing_entry(stdscr, entry, text_key, y, is_selected=False, scroll_left=0, is_edit_mode=False):
     """Render a task with proper formatting and positioning"""
@@ -154,6 +192,7 @@ def print_editing_entry(stdscr, entry, text_key, y, is_selected=False, scroll_le
     sf.safe_appendstr(stdscr, ' ', curses.color_pair(thm.SELECTION_COLOR_PAIR_NUM))
     sf.safe_addstr(stdscr, y, st.latest_max_x - 1, '│')
 
+@ov.timed("render")
 def print_status_bar(stdscr):
     """Print centered status bar with progress, percentage, date and time"""
     done_cnt = tsk.done_count(st.current_cat_tasks)
@@ -167,9 +206,15 @@ def print_status_bar(stdscr):
         color_text = "green"
     color_pair = thm.get_color_pair_by_str(color_text)
     
-    # Add command hint at the beginning (dimmed)
-    hint_text = ":help or '/' to search"
-    sf.safe_addstr(stdscr, st.latest_max_y - 2, 1, hint_text, thm.get_color_pair_by_str("grey"))
+    # Add command hint at the beginning (dimmed), or the update banner if there is a new version
+    if st.latest_version:
+        hint_text = f"v{st.latest_version} available, :update"
+        sf.safe_addstr(stdscr, st.latest_max_y - 2, 1, hint_text, thm.get_theme_color_pair_for_text())
+    elif ov.enabled and not st.searching:
+        print_dev_overlay(stdscr)
+    else:
+        hint_text = ":help or '/' to search"
+        sf.safe_addstr(stdscr, st.latest_max_y - 2, 1, hint_text, thm.get_color_pair_by_str("grey"))
     
     # Split the status into parts for coloring
     status_prefix = f"Done: {done_cnt}/{st.task_cnt} "
@@ -196,18 +241,38 @@ def print_status_bar(stdscr):
     sf.safe_appendstr(stdscr, padding)
     sf.safe_appendstr(stdscr, datetime_str)
 
+def print_dev_overlay(stdscr):
+    """Timings and counters of the last handled key in place of the command hint"""
+    # Leave room for the status on the right
+    width = st.latest_max_x - 38
+    if width > 0:
+        text = ov.get_text()[:width].ljust(width)
+        sf.safe_addstr(stdscr, st.latest_max_y - 2, 1, text, thm.get_color_pair_by_str("grey"))
+
 def print_category_entries(stdscr, categories, start_index):
-    """Print the category sidebar"""
+    """Print the category sidebar, skipping rows unchanged since the last frame"""
     
     # Print visible categories
     visible_categories = categories[start_index:start_index + st.latest_max_capacity]
     for i, category in enumerate(visible_categories):
         row = i + 1  # Start from row 1 (row 0 is for status bar)
         is_selected = category["id"] == st.current_category_id
-        print_category(stdscr, category, row, is_selected)
+        segments = _category_segments(category, row, is_selected)
+        if _frame_valid:
+            if _sidebar_rows.get(row) == segments:
+                continue
+            clear_sidebar_row(stdscr, row)
+        _emit(stdscr, segments)
+        _sidebar_rows[row] = segments
+    for row in [r for r in _sidebar_rows if r > len(visible_categories)]:
+        clear_sidebar_row(stdscr, row)
+        del _sidebar_rows[row]
 
 def print_category(stdscr, category, y, is_selected=False):
     """Print a single category in the sidebar with fixed width"""
+    _emit(stdscr, _category_segments(category, y, is_selected))
+
+def _category_segments(category, y, is_selected=False) -> list:
     # Set format based on selection and focus
     attr = 0
     if is_selected and st.focus_manager.is_sidebar_focused():
@@ -216,28 +281,45 @@ def print_category(stdscr, category, y, is_selected=False):
         attr = thm.get_theme_color_pair_for_text() | curses.A_BOLD
     attr = attr | (curses.A_BOLD if st.bold_text else 0)
             
-    sf.safe_addstr(stdscr, y, 1, ' ', attr)
+    segments = [(y, 1, ' ', attr)]
     # Display name with fixed width - now at position 2 (after the left frame)
-    sf.safe_addstr(stdscr, y, 2, category["name"], attr)
+    segments.append((y, 2, category["name"], attr))
     # Fill remaining space with spaces to ensure fixed width
     padding = cat.MAX_CATEGORY_NAME_LENGTH + 1 - len(category["name"])
     if padding > 0:
-        sf.safe_appendstr(stdscr, ' ' * padding, attr)
+        segments.append((y, None, ' ' * padding, attr))
+    return segments
 
 def print_task_entries(stdscr, x_offset=0):
-    """Print tasks with horizontal offset to accommodate sidebar"""
+    """Print tasks with horizontal offset to accommodate sidebar, skipping rows unchanged since the last frame"""
 
     sidebar_focused = st.focus_manager.is_sidebar_focused()
+    row_cnt = 0
     if st.current_cat_tasks and st.start_task_id > 0:
         for i, task in enumerate(st.current_cat_tasks[st.start_task_id - 1:st.end_task_id]):
             row = i + 1  # +1 due to status bar
+            row_cnt = row
             is_selected = st.start_task_id + i == st.current_task_id and not sidebar_focused and not st.adding_task 
-            print_task_entry(stdscr, task, row, is_selected=is_selected, x_offset=x_offset)
+            segments = _task_entry_segments(task, row, is_selected, x_offset)
+            # Keep the right frame that print_frame_all() would draw over a selected row
+            segments.append((row, st.latest_max_x - 1, '│', 0))
+            if _frame_valid:
+                if _task_rows.get(row) == segments:
+                    continue
+                # Strikethrough text is shorter on screen than its padding assumes
+                clear_task_row(stdscr, row)
+            _emit(stdscr, segments)
+            _task_rows[row] = segments
+    for row in [r for r in _task_rows if r > row_cnt]:
+        clear_task_row(stdscr, row)
+        del _task_rows[row]
 
 def print_task_entry(stdscr, task, row, is_selected=False, x_offset=0):
     """Print a task with horizontal offset and optional display ID override"""
-    
-    print_task_symbols(stdscr, task, row, is_selected=is_selected)
+    _emit(stdscr, _task_entry_segments(task, row, is_selected, x_offset))
+
+def _task_entry_segments(task, row, is_selected=False, x_offset=0) -> list:
+    segments = _task_symbol_segments(task, row, is_selected)
     
     due_str = due.get_due_str(task)
     due_pos = st.latest_max_x - len(due_str) - 1  # Only 1 char gap from right frame
@@ -279,23 +361,35 @@ def print_task_entry(stdscr, task, row, is_selected=False, x_offset=0):
             attr_non_selection = 0
     attr_non_selection = attr_non_selection | (curses.A_BOLD if st.bold_text else 0)
     
+    padding = ' ' * (available_width - len(visible_text) + 1)
     if is_selected:
-        sf.safe_addstr(stdscr, row, x_offset, f"{task_id:2d} ", attr_selection)
-        sf.safe_addstr(stdscr, row, total_indent, visible_text, attr_selection)
-        for _ in range(available_width - len(visible_text) + 1):
-            sf.safe_appendstr(stdscr, ' ', attr_selection)
-        sf.safe_addstr(stdscr, row, due_pos, due_str, attr_selection)
-        sf.safe_addstr(stdscr, row, st.latest_max_x - 1, ' ', attr_selection)
+        segments.append((row, x_offset, f"{task_id:2d} ", attr_selection))
+        segments.append((row, total_indent, visible_text, attr_selection))
+        segments.append((row, None, padding, attr_selection))
+        segments.append((row, due_pos, due_str, attr_selection))
+        segments.append((row, st.latest_max_x - 1, ' ', attr_selection))
     else:
-        sf.safe_addstr(stdscr, row, x_offset, f"{task_id:2d} ")
-        sf.safe_addstr(stdscr, row, total_indent, visible_text, attr_non_selection)
-        for _ in range(available_width - len(visible_text) + 1):
-            sf.safe_appendstr(stdscr, ' ')
-        sf.safe_addstr(stdscr, row, due_pos, due_str, attr_non_selection)
-        sf.safe_addstr(stdscr, row, st.latest_max_x - 1, '│')
-
+        segments.append((row, x_offset, f"{task_id:2d} ", 0))
+        segments.append((row, total_indent, visible_text, attr_non_selection))
+        segments.append((row, None, padding, 0))
+        segments.append((row, due_pos, due_str, attr_non_selection))
+        segments.append((row, st.latest_max_x - 1, '│', 0))
+    return segments
+
+@ov.timed("render")
 def print_whole_view(stdscr, categories, category_start_index):
-    """Print the complete UI with sidebar and task list"""
+    """
+    Print the complete UI with sidebar and task list.
+    If the last frame is still on screen only the rows that changed are redrawn.
+    """
+    global _frame_valid
+    
+    if _frame_valid and st.task_cnt > 0:
+        print_task_entries(stdscr, cat.SIDEBAR_WIDTH)
+        print_category_entries(stdscr, categories, category_start_index)
+        clear_status(stdscr)
+        print_status_bar(stdscr)
+        return
     
     clear_task_panel(stdscr)
     if st.task_cnt == 0:
@@ -309,6 +403,8 @@ def print_whole_view(stdscr, categories, category_start_index):
     print_frame_all(stdscr)
     clear_status(stdscr)
     print_status_bar(stdscr)
+    # The empty message is not part of the row model, redraw fully next time
+    _frame_valid = st.task_cnt > 0
 
 def print_pref_panel(stdscr, current_selection_index=0):
     """
@@ -464,29 +560,6 @@ def print_pref_line_with_highlight(stdscr, y, pos, line, center_offset_x, center
     if suffix_pos < st.latest_max_x and len(suffix) > 0:
         sf.safe_addstr(stdscr, y + center_offset_y + 1, suffix_pos, suffix[:st.latest_max_x-suffix_pos-1])
 
-def print_tasks_cli(todos):
-    if len(todos) == 0:
-        print("no todos yet")
-        exit(0)
-        
-    tsk.reassign_task_ids(todos)
-    done_fmt = "\033[9m%s\033[0m"     # strikethrough
-    flag_color = "\033[31m%s\033[0m"   # red for flag
-    check_color = "\033[32m%s\033[0m"  # green for checkmark
-    
-    for todo in todos:
-        id_part = f'#{todo["id"]:02d}'
-
-        flag_symbol = flag_color % "⚑ " if todo.get("flagged") else "  "
-        check_symbol = check_color % "✓ " if todo.get("done") else "  "
-        
-        description = todo["description"]
-        if todo.get("done"):
-            description = done_fmt % description
-            
-        todo_line = f'{id_part} {flag_symbol}{check_symbol}{description} ({todo["due"]})'
-        print(todo_line)
-        
 # Functions for drawing frames and separators
 def print_right_frame(stdscr):
     for y in range(1, st.latest_max_y - 3):
@@ -1,6 +1,110 @@
+from collections import defaultdict
+
+# Trigram index over lowercase descriptions, built on the first search of a task list
+# and kept up to date by task.save_task() and task.delete_tasks_by_uuids().
+# Every indexed task gets a serial number in list order, so sorting serials
+# gives back the order of the task list. Tasks are found by identity, they are
+# kept alive by _tasks so their id() can not be reused while indexed.
+_task_list = None
+_tasks = {}
+_lowered = {}
+_serials = {}
+_trigrams = defaultdict(set)
+_next_serial = 0
+
+# Result of the last query, a longer query only has to filter it
+_last_query = None
+_last_serials = []
+
+def _trigrams_of(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _forget_last_query():
+    global _last_query, _last_serials
+    _last_query = None
+    _last_serials = []
+
+def _index_description(serial, description):
+    lowered = description.lower()
+    _lowered[serial] = lowered
+    for trigram in _trigrams_of(lowered):
+        _trigrams[trigram].add(serial)
+
+def _unindex_description(serial):
+    for trigram in _trigrams_of(_lowered.pop(serial)):
+        serials = _trigrams[trigram]
+        serials.discard(serial)
+        if not serials:
+            del _trigrams[trigram]
+
+def _add(task):
+    global _next_serial
+    serial = _next_serial
+    _next_serial += 1
+    _tasks[serial] = task
+    _serials[id(task)] = serial
+    _index_description(serial, task["description"])
+
+def build(task_list):
+    """Index all tasks of task_list"""
+    global _task_list, _next_serial
+    _task_list = task_list
+    _tasks.clear()
+    _lowered.clear()
+    _serials.clear()
+    _trigrams.clear()
+    _next_serial = 0
+    _forget_last_query()
+    for task in task_list:
+        _add(task)
+
+def invalidate():
+    """Rebuild the index on the next search, e.g. after the task list was replaced"""
+    global _task_list
+    _task_list = None
+
+def index_task(task):
+    """Index an added task or reindex an edited one, no-op until the first search"""
+    if _task_list is None:
+        return
+    serial = _serials.get(id(task))
+    if serial is not None:
+        if _lowered[serial] == task["description"].lower():
+            return
+        # Keep the serial so the task keeps its place in the results
+        _unindex_description(serial)
+        _index_description(serial, task["description"])
+    else:
+        _add(task)
+    _forget_last_query()
+
+def unindex_tasks(tasks):
+    """Drop deleted tasks from the index, no-op until the first search"""
+    if _task_list is None:
+        return
+    for task in tasks:
+        serial = _serials.pop(id(task), None)
+        if serial is not None:
+            _unindex_description(serial)
+            del _tasks[serial]
+    _forget_last_query()
+
 def search(query, task_list) -> list:
+    global _last_query, _last_serials
+    if task_list is not _task_list:
+        build(task_list)
     query = query.lower()
-    return [
-        task for task in task_list
-        if query in task["description"].lower()
-    ]
+    if _last_query is not None and query.startswith(_last_query):
+        serials = [s for s in _last_serials if query in _lowered[s]]
+    elif len(query) < 3:
+        serials = [s for s in _tasks if query in _lowered[s]]
+    else:
+        candidates = sorted((_trigrams.get(t, ()) for t in _trigrams_of(query)), key=len)
+        if candidates and candidates[0]:
+            matched = set(candidates[0]).intersection(*candidates[1:])
+            serials = sorted(s for s in matched if query in _lowered[s])
+        else:
+            serials = []
+    _last_query = query
+    _last_serials = serials
+    return [_tasks[s] for s in serials]
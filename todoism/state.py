@@ -38,5 +38,13 @@ strikethrough = False
 sort_by_flagged = False
 sort_by_done = False
 bold_text = False
+# 0 means no limit
+max_task_count = 0
+# None until settings are loaded, files then keep their current format
+storage_format = None
+storage_backend = None
+
+# Newer version found by the update check, shown in the status bar
+latest_version = None
 
 dev_mode = False
\ No newline at end of file
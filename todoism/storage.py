@@ -0,0 +1,430 @@
+import os
+import json
+
+import todoism.preference as pref
+import todoism.state as st
+import todoism.codec as codec
+import todoism.journal as jr
+import todoism.taskrecord as rec
+
+# Storage backends behind task.py and category.py, picked by the storage_backend setting:
+#   file    tasks.json with its journal and categories.json
+#   sqlite  a single todoism.db in WAL mode
+BACKENDS = ("file", "sqlite")
+DEFAULT_BACKEND = "file"
+
+_storages = {}
+
+def get_storage():
+    """The storage of the configured backend, one instance per backend and data location"""
+    backend = st.storage_backend or pref.get_setting("storage_backend", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        backend = DEFAULT_BACKEND
+    key = (backend, st.dev_mode)
+    if key not in _storages:
+        _storages[key] = SQLiteStorage() if backend == "sqlite" else FileStorage()
+    return _storages[key]
+
+def _to_task(task):
+    return task if isinstance(task, rec.Task) else rec.Task.from_dict(task)
+
+def _fingerprints(task_list) -> dict:
+    return {rec.task_uuid_key(task): _to_task(task).fingerprint() for task in task_list}
+
+def merge(task_list, stored_tasks, base) -> list:
+    """
+    Three-way merge of a full save with tasks another process stored since
+    this one read them. base maps the uuid keys read back then to their fingerprints.
+    Changes of this process win over changes of others to the same task,
+    changes to different tasks are all kept. Tasks of task_list keep their
+    identity, changes from elsewhere are copied into them. Tasks added
+    elsewhere go to the end.
+    """
+    stored_by_uuid = {rec.task_uuid_key(task): task for task in stored_tasks}
+    merged = []
+    seen = set()
+    for task in task_list:
+        task_uuid = rec.task_uuid_key(task)
+        seen.add(task_uuid)
+        if task_uuid is not None and base.get(task_uuid) == _to_task(task).fingerprint():
+            # Unchanged here, so the stored version is the newest, or none if it was deleted elsewhere
+            stored = stored_by_uuid.get(task_uuid)
+            if stored is None:
+                continue
+            if isinstance(task, rec.Task):
+                task.assign(_to_task(stored))
+            else:
+                task = stored
+        merged.append(task)
+    for task in stored_tasks:
+        task_uuid = rec.task_uuid_key(task)
+        if task_uuid in seen:
+            continue
+        if task_uuid in base and base[task_uuid] == _to_task(task).fingerprint():
+            # Deleted here and not changed elsewhere
+            continue
+        merged.append(task)
+    return merged
+
+def _changes_from_records(records) -> tuple:
+    """Journal records folded into the last state per uuid"""
+    stored_tasks = {}
+    deleted_uuids = set()
+    for record in records:
+        if record.get("op") == "put":
+            task = _to_task(record["task"])
+            stored_tasks[rec.task_uuid_key(task)] = task
+            deleted_uuids.discard(task.get("uuid"))
+        elif record.get("op") == "delete":
+            for task_uuid in record["uuids"]:
+                stored_tasks.pop(rec.uuid_key(task_uuid), None)
+                deleted_uuids.add(task_uuid)
+    return list(stored_tasks.values()), list(deleted_uuids)
+
+def _changes_from_tasks(stored_tasks, base) -> tuple:
+    """Difference of all stored tasks to the fingerprints read before"""
+    changed = [task for task in stored_tasks if base.get(rec.task_uuid_key(task)) != task.fingerprint()]
+    stored_uuids = {rec.task_uuid_key(task) for task in stored_tasks}
+    return changed, [rec.uuid_from_key(task_uuid) for task_uuid in base if task_uuid not in stored_uuids]
+
+def _update_base(base, stored_tasks, deleted_uuids):
+    for task in stored_tasks:
+        base[rec.task_uuid_key(task)] = task.fingerprint()
+    for task_uuid in deleted_uuids:
+        base.pop(rec.uuid_key(task_uuid), None)
+
+class FileStorage:
+    """
+    Tasks as a snapshot file plus an append-only journal, categories as a plain file.
+    Single task changes are journal appends, which never conflict. A full save
+    checks the files' version against the one this process last saw and merges
+    with whatever other processes wrote in between instead of overwriting it.
+    """
+
+    def __init__(self):
+        self._base = None
+        self._version = None
+
+    def get_paths(self) -> list:
+        file_path = pref.get_tasks_file_path()
+        return [file_path, jr.get_journal_path(file_path), jr.get_rotated_journal_path(file_path)]
+
+    def _read_tasks(self, file_path) -> list:
+        try:
+            task_list = codec.load(file_path)
+        except (FileNotFoundError, ValueError):
+            task_list = []
+        return [_to_task(task) for task in jr.replay(task_list, file_path)]
+
+    def load_tasks(self) -> list:
+        file_path = pref.get_tasks_file_path()
+        with jr.lock(file_path):
+            task_list = self._read_tasks(file_path)
+            self._version = jr.get_version(file_path)
+        self._base = _fingerprints(task_list)
+        return task_list
+
+    def save_tasks(self, task_list, file_path=None) -> list:
+        """
+        Write a full snapshot with lock protection, dropping the journal.
+        Returns the saved list, which differs from task_list if changes of
+        other processes were merged in.
+        """
+        if file_path:
+            with jr.lock(file_path):
+                codec.dump(task_list, file_path)
+                jr.discard(file_path)
+            return task_list
+        file_path = pref.get_tasks_file_path()
+        with jr.lock(file_path):
+            if self._base is not None and jr.get_version(file_path) != self._version:
+                task_list = merge(task_list, self._read_tasks(file_path), self._base)
+            codec.dump(task_list, file_path)
+            jr.discard(file_path)
+            self._version = jr.get_version(file_path)
+        self._base = _fingerprints(task_list)
+        return task_list
+
+    def read_changes(self):
+        """
+        What other processes stored since this one last read or wrote, as a list
+        of added or changed tasks and a list of deleted uuids. None if nothing changed.
+        Only new journal records are read as long as the snapshot stays the same.
+        """
+        file_path = pref.get_tasks_file_path()
+        with jr.lock(file_path):
+            version = jr.get_version(file_path)
+            if self._base is None or version == self._version:
+                return None
+            if version[:2] == self._version[:2] and version[2] > self._version[2]:
+                records = jr.read_records(jr.get_journal_path(file_path), self._version[2])
+                changes = _changes_from_records(records)
+            else:
+                changes = _changes_from_tasks(self._read_tasks(file_path), self._base)
+            self._version = version
+        _update_base(self._base, *changes)
+        return changes
+
+    def put_task(self, task):
+        self._append_record(jr.put_record(task))
+        if self._base is not None:
+            self._base[rec.task_uuid_key(task)] = _to_task(task).fingerprint()
+
+    def delete_tasks(self, task_uuids):
+        task_uuids = list(task_uuids)
+        self._append_record(jr.delete_record(task_uuids))
+        if self._base is not None:
+            for task_uuid in task_uuids:
+                self._base.pop(rec.uuid_key(task_uuid), None)
+
+    def _append_record(self, record):
+        file_path = pref.get_tasks_file_path()
+        with jr.lock(file_path):
+            # Only our own record is new if nobody else wrote since, then the version stays ours
+            up_to_date = self._version is not None and jr.get_version(file_path) == self._version
+            jr.write_record(file_path, record)
+            if up_to_date:
+                self._version = jr.get_version(file_path)
+        if jr.needs_compaction(file_path):
+            jr.compact_async(file_path)
+
+    def _read_locked(self) -> list:
+        file_path = pref.get_tasks_file_path()
+        with jr.lock(file_path):
+            return self._read_tasks(file_path)
+
+    def count_tasks(self) -> int:
+        return len(self._read_locked())
+
+    def task_uuid_at(self, position: int):
+        """uuid of the task at a 0-based position in insertion order, None if out of range"""
+        task_list = self._read_locked()
+        return task_list[position].get("uuid") if 0 <= position < len(task_list) else None
+
+    def iter_tasks(self):
+        return iter(self._read_locked())
+
+    def load_categories(self) -> list:
+        return codec.load(pref.get_categories_file_path())
+
+    def save_categories(self, category_list):
+        codec.dump(category_list, pref.get_categories_file_path(), tasks=False)
+
+    def backup(self, backup_dir: str) -> bool:
+        """Copy tasks, their journals and categories into backup_dir"""
+        import shutil
+        tasks_path = pref.get_tasks_file_path()
+        categories_path = pref.get_categories_file_path()
+        success = True
+        with jr.lock(tasks_path):
+            for source in (tasks_path, jr.get_rotated_journal_path(tasks_path), jr.get_journal_path(tasks_path)):
+                if os.path.exists(source):
+                    shutil.copy2(source, backup_dir)
+                elif source == tasks_path:
+                    success = False
+        if os.path.exists(categories_path):
+            shutil.copy2(categories_path, backup_dir)
+        else:
+            success = False
+        return success
+
+# Schema keys that have their own column, everything else goes into the extra JSON
+_TASK_COLUMNS = ("uuid", "id", "description", "due", "created", "done", "flagged", "category_id")
+_BOOL_COLUMNS = ("done", "flagged")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid TEXT UNIQUE,
+    id INTEGER,
+    description TEXT,
+    due TEXT,
+    created TEXT,
+    done INTEGER,
+    flagged INTEGER,
+    category_id INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_category_id ON tasks (category_id);
+CREATE INDEX IF NOT EXISTS tasks_done ON tasks (done);
+CREATE INDEX IF NOT EXISTS tasks_flagged ON tasks (flagged);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due);
+CREATE TABLE IF NOT EXISTS categories (
+    position INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+_UPSERT = (
+    "INSERT INTO tasks (uuid, id, description, due, created, done, flagged, category_id, extra) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (uuid) DO UPDATE SET id = excluded.id, description = excluded.description, "
+    "due = excluded.due, created = excluded.created, done = excluded.done, flagged = excluded.flagged, "
+    "category_id = excluded.category_id, extra = excluded.extra"
+)
+_SELECT = "SELECT uuid, id, description, due, created, done, flagged, category_id, extra FROM tasks"
+# Stay below SQLite's limit of host parameters per statement
+_DELETE_CHUNK = 500
+
+class SQLiteStorage:
+    """
+    Tasks and categories in one SQLite database. Single task changes are
+    upserts and deletions by the indexed uuid, tasks keep their insertion
+    order through the seq column. The JSON files are imported once when the
+    database is created.
+    """
+
+    def __init__(self):
+        self._connection = None
+        self._base = None
+        self._data_version = None
+
+    def _connect(self):
+        if self._connection is None:
+            # Imported here so the file backend and the CLI don't pay for it
+            import sqlite3
+            db_path = pref.get_database_file_path()
+            is_new = not os.path.exists(db_path)
+            connection = sqlite3.connect(db_path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            if is_new:
+                self._import_files()
+        return self._connection
+
+    def _import_files(self):
+        file_storage = FileStorage()
+        task_list = file_storage.load_tasks()
+        if task_list:
+            self.save_tasks(task_list)
+        try:
+            self.save_categories(file_storage.load_categories())
+        except (FileNotFoundError, ValueError):
+            pass
+
+    @staticmethod
+    def _row(task) -> tuple:
+        task = _to_task(task)
+        values = []
+        for key in _TASK_COLUMNS:
+            value = task.get(key)
+            values.append(int(value) if key in _BOOL_COLUMNS and value is not None else value)
+        values.append(json.dumps(task.extra) if task.extra else None)
+        return tuple(values)
+
+    @staticmethod
+    def _task(row) -> rec.Task:
+        task_dict = {}
+        for key, value in zip(_TASK_COLUMNS, row):
+            if value is not None:
+                task_dict[key] = bool(value) if key in _BOOL_COLUMNS else value
+        if row[-1]:
+            task_dict.update(json.loads(row[-1]))
+        return rec.Task.from_dict(task_dict)
+
+    def get_paths(self) -> list:
+        db_path = pref.get_database_file_path()
+        # Commits in WAL mode go to the -wal file first
+        return [db_path, db_path + "-wal"]
+
+    def _get_data_version(self) -> int:
+        """Changes whenever another connection committed, our own commits leave it alone"""
+        return self._connect().execute("PRAGMA data_version").fetchone()[0]
+
+    def load_tasks(self) -> list:
+        connection = self._connect()
+        with connection:
+            # A read transaction keeps the rows and the data version consistent
+            connection.execute("BEGIN")
+            task_list = [self._task(row) for row in connection.execute(_SELECT + " ORDER BY seq")]
+            self._data_version = self._get_data_version()
+        self._base = _fingerprints(task_list)
+        return task_list
+
+    def read_changes(self):
+        """Like FileStorage.read_changes(), any commit of another connection means a full read"""
+        if self._base is None or self._get_data_version() == self._data_version:
+            return None
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN")
+            stored_tasks = [self._task(row) for row in connection.execute(_SELECT + " ORDER BY seq")]
+            self._data_version = self._get_data_version()
+        changes = _changes_from_tasks(stored_tasks, self._base)
+        _update_base(self._base, *changes)
+        return changes
+
+    def save_tasks(self, task_list, file_path=None) -> list:
+        """Replace all tasks, merging in what other connections wrote since our last read"""
+        if file_path:
+            return FileStorage().save_tasks(task_list, file_path)
+        connection = self._connect()
+        with connection:
+            # Take the write lock up front so nobody commits between the check and the write
+            connection.execute("BEGIN IMMEDIATE")
+            if self._base is not None and self._get_data_version() != self._data_version:
+                stored_tasks = [self._task(row) for row in connection.execute(_SELECT + " ORDER BY seq")]
+                task_list = merge(task_list, stored_tasks, self._base)
+            connection.execute("DELETE FROM tasks")
+            connection.executemany(_UPSERT, (self._row(task) for task in task_list))
+            self._data_version = self._get_data_version()
+        self._base = _fingerprints(task_list)
+        return task_list
+
+    def put_task(self, task):
+        connection = self._connect()
+        with connection:
+            connection.execute(_UPSERT, self._row(task))
+        if self._base is not None:
+            self._base[rec.task_uuid_key(task)] = _to_task(task).fingerprint()
+
+    def delete_tasks(self, task_uuids):
+        task_uuids = list(task_uuids)
+        connection = self._connect()
+        with connection:
+            for i in range(0, len(task_uuids), _DELETE_CHUNK):
+                chunk = task_uuids[i:i + _DELETE_CHUNK]
+                connection.execute(f"DELETE FROM tasks WHERE uuid IN ({','.join('?' * len(chunk))})", chunk)
+        if self._base is not None:
+            for task_uuid in task_uuids:
+                self._base.pop(rec.uuid_key(task_uuid), None)
+
+    def count_tasks(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def task_uuid_at(self, position: int):
+        if position < 0:
+            return None
+        row = self._connect().execute("SELECT uuid FROM tasks ORDER BY seq LIMIT 1 OFFSET ?", (position,)).fetchone()
+        return row[0] if row else None
+
+    def iter_tasks(self):
+        for row in self._connect().execute(_SELECT + " ORDER BY seq"):
+            yield self._task(row)
+
+    def load_categories(self) -> list:
+        rows = self._connect().execute("SELECT data FROM categories ORDER BY position").fetchall()
+        if not rows:
+            raise FileNotFoundError("no categories stored yet")
+        return [json.loads(row[0]) for row in rows]
+
+    def save_categories(self, category_list):
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM categories")
+            connection.executemany(
+                "INSERT INTO categories (position, data) VALUES (?, ?)",
+                ((i, json.dumps(category)) for i, category in enumerate(category_list))
+            )
+
+    def backup(self, backup_dir: str) -> bool:
+        """Copy the database with SQLite's online backup, safe while it is written to"""
+        import sqlite3
+        source = sqlite3.connect(pref.get_database_file_path())
+        target = sqlite3.connect(os.path.join(backup_dir, os.path.basename(pref.get_database_file_path())))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        return True
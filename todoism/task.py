@@ -1,14 +1,17 @@
-import json
-import uuid
 from datetime import datetime
 
-import todoism.preference as pref
 import todoism.state as st
 import todoism.backup as bkp
+import todoism.archive as arc
+import todoism.view as vw
+import todoism.taskstore as ts
+import todoism.taskrecord as rec
+import todoism.search as srch
+import todoism.storage as stg
+import todoism.overlay as ov
 
 MAX_TASK_DESCRIPTION_LENGTH = 256
 TASK_INDENT_IN_TASK_PANEL = 7 # ID (2) + space (1) + flag (1) + space (1) + done (1) + space (1)
-MAX_TASK_COUNT = 1024
 
 def done_count(task_list):
     count = 0
@@ -17,21 +20,22 @@ def done_count(task_list):
             count = count + 1
     return count        
 
+@ov.timed("storage", "load")
 def load_tasks():
-    """Load tasks from file"""
-    try:
-        with open(pref.get_tasks_file_path(), 'r') as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    """Load all tasks from the configured storage"""
+    return ts.TaskStore(stg.get_storage().load_tasks())
+
+def iter_tasks():
+    """Iterate over all stored tasks in insertion order, streamed where the storage allows it"""
+    return stg.get_storage().iter_tasks()
+
+def get_task_file_paths():
+    """Files that change whenever tasks are stored"""
+    return stg.get_storage().get_paths()
 
 def load_purged_tasks():
-    try:
-        with open(pref.get_purged_file_path(), 'r') as f:
-            purged_tasks = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        purged_tasks = []
-    return purged_tasks
+    """Load all purged tasks from the archive"""
+    return arc.load_tasks()
 
 def repair_tasks():
     task_list = load_tasks()
@@ -44,65 +48,103 @@ def repair_tasks():
 
 def create_new_task(task_id, task_description="", flagged=False, category_id=0, due=""):
     """Create a new task with UUID and optional category assignment"""
-    return {
-        "uuid": str(uuid.uuid4()),
-        "id": task_id,
-        "description": task_description,
-        "due": due,
-        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "done": False,
-        "flagged": flagged,
-        "category_id": category_id
-    }
+    return rec.Task(
+        rec.new_uuid(),
+        task_id,
+        task_description,
+        due,
+        datetime.now().strftime(rec.CREATED_FORMAT),
+        False,
+        flagged,
+        category_id
+    )
 
+@ov.timed("storage", "save")
 def save_tasks(task_list, custom_path=None):
-    """Save tasks to file with lock protection"""
-    import fcntl
-    import os
-    
-    file_path = custom_path if custom_path else pref.get_tasks_file_path()
-    lock_path = file_path + '.lock'
-    
+    """
+    Replace all stored tasks, custom_path writes a task file there instead.
+    Changes other processes stored in the meantime are merged into task_list in place.
+    """
     try:
-        with open(lock_path, 'w') as lock_file:
-            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
-            with open(file_path, 'w') as file:
-                json.dump(task_list, file, indent=4)
+        saved_tasks = stg.get_storage().save_tasks(task_list, custom_path)
+        if saved_tasks is not task_list:
+            task_list[:] = saved_tasks
+            srch.invalidate()
     finally:
-        if os.path.exists(lock_path):
-            os.remove(lock_path)
-        bkp.backup_data()
-            
+        bkp.schedule_backup()
+
+@ov.timed("storage", "save")
+def save_task(task):
+    """Store a single added or changed task"""
+    srch.index_task(task)
+    stg.get_storage().put_task(task)
+    bkp.schedule_backup()
+
+@ov.timed("storage", "save")
+def save_task_deletion(task_uuids):
+    """Remove the given tasks from storage"""
+    stg.get_storage().delete_tasks(task_uuids)
+    bkp.schedule_backup()
+
+
+@ov.timed("storage", "load")
+def apply_stored_changes(task_list):
+    """
+    Bring task_list up to date with what other processes stored, by uuid and in place.
+    Changed tasks keep their identity. Returns the added, changed and deleted tasks.
+    """
+    changes = stg.get_storage().read_changes()
+    if changes is None:
+        return [], [], []
+    stored_tasks, deleted_uuids = changes
+    added = []
+    changed = []
+    category_changed = False
+    for stored in stored_tasks:
+        task = task_list.get(stored["uuid"])
+        if task is None:
+            task_list.append(stored)
+            added.append(stored)
+        elif task.fingerprint() != stored.fingerprint():
+            category_changed = category_changed or task["category_id"] != stored["category_id"]
+            task.assign(stored)
+            changed.append(task)
+    deleted = [task for task in map(task_list.get, deleted_uuids) if task is not None]
+    srch.unindex_tasks(deleted)
+    task_list.delete_uuids(deleted_uuids)
+    if category_changed:
+        task_list.reindex()
+    for task in added + changed:
+        srch.index_task(task)
+    return added, changed, deleted
+
 def add_new_task_cli(task_description, flagged=False):
-    task_list = load_tasks()
-    new_task_id = len(task_list) + 1
+    new_task_id = stg.get_storage().count_tasks() + 1
     new_task = create_new_task(new_task_id, task_description, flagged)
-    task_list.append(new_task)
-    save_tasks(task_list)
+    save_task(new_task)
     return new_task_id
 
 def delete_task_cli(task_id):
     """Remove a task by its display ID from the command line"""
-    task_list = load_tasks()
-    reassign_task_ids(task_list)
-    if task_id <= len(task_list):
-        task_uuid = task_list[task_id - 1].get("uuid")
-        if task_uuid:
-            task_list = delete_task_by_uuid(task_list, task_uuid)
-        return True
-    return False
+    task_uuid = stg.get_storage().task_uuid_at(task_id - 1)
+    if task_uuid is None:
+        return False
+    save_task_deletion([task_uuid])
+    return True
 
 def add_new_task(task_list, task_id, task_description, flagged=False, category_id=0, due=""):
     """Create, append and save a new task with category support"""
     new_task = create_new_task(task_id, task_description, flagged, category_id, due)
     task_list.append(new_task)
-    save_tasks(task_list)
+    save_task(new_task)
     return task_list
 
 def get_tasks_by_category_id(task_list, category_id):
     """Filter tasks by category"""
     if category_id == 0:  # All Tasks category
         return task_list
+    if isinstance(task_list, ts.TaskStore):
+        return task_list.by_category(category_id)
     
     result = []
     for task in task_list:
@@ -122,7 +164,7 @@ def update_existing_tasks():
             modified = True
         
         if "uuid" not in task:
-            task["uuid"] = str(uuid.uuid4())
+            task["uuid"] = rec.new_uuid()
             modified = True
         
         if "due" not in task:
@@ -145,21 +187,32 @@ def reassign_task_ids(task_list):
 
 def delete_task_by_uuid(task_list, task_uuid):
     """Delete task by UUID and return updated list"""
-    task_list = [task for task in task_list if task.get("uuid") != task_uuid]
-    reassign_task_ids(task_list)
-    save_tasks(task_list)
+    return delete_tasks_by_uuids(task_list, [task_uuid])
+
+def delete_tasks_by_uuids(task_list, task_uuids, deleted_category_id=None):
+    """
+    Delete all tasks whose UUID is in task_uuids with a single write.
+    If deleted_category_id is given, tasks of later categories also move one category id down,
+    which is written as a full snapshot instead of a journal record.
+    Display ids are left alone, they are positions in the sorted view which renumbers itself.
+    """
+    task_uuids = set(task_uuids)
+    if not isinstance(task_list, ts.TaskStore):
+        task_list = ts.TaskStore(task_list)
+    srch.unindex_tasks([task for task in map(task_list.get, task_uuids) if task is not None])
+    task_list.delete_uuids(task_uuids)
+    if deleted_category_id is not None:
+        for task in task_list:
+            if task["category_id"] > deleted_category_id:
+                task["category_id"] -= 1
+        task_list.reindex()
+        save_tasks(task_list)
+    elif task_uuids:
+        save_task_deletion(task_uuids)
     return task_list
 
 def flip_by_key(task_index, key: str, task_list):
-    st.current_cat_tasks[task_index][key] = not st.current_cat_tasks[task_index][key]
-    save_tasks(task_list)
-    
-def sort(task_list, key) -> list:
-    marked = []
-    not_marked = []
-    for t in task_list:
-        if t[key] is True:
-            marked.append(t)
-        else:
-            not_marked.append(t)
-    return marked + not_marked
+    task = st.current_cat_tasks[task_index]
+    task[key] = not task[key]
+    save_task(task)
+    vw.reposition(task)
@@ -0,0 +1,231 @@
+import os
+from datetime import datetime, timedelta
+
+CREATED_FORMAT = "%Y-%m-%d %H:%M:%S"
+_EPOCH = datetime(1970, 1, 1)
+
+# Keys of the tasks.json schema in the order they are written
+FIELDS = ("uuid", "id", "description", "due", "created", "done", "flagged", "category_id")
+
+class _Missing:
+    """Marks a schema key that the task was loaded without"""
+    __slots__ = ()
+    def __repr__(self):
+        return "<missing>"
+
+_MISSING = _Missing()
+
+def new_uuid() -> str:
+    """A random version 4 uuid string, without importing the uuid module"""
+    raw = bytearray(os.urandom(16))
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    return _unpack_uuid(bytes(raw))
+
+def _pack_uuid(value):
+    """16 raw bytes for canonical uuid strings, anything else is kept as is"""
+    if type(value) is str and len(value) == 36:
+        try:
+            packed = bytes.fromhex(value.replace('-', ''))
+        except ValueError:
+            return value
+        if len(packed) == 16 and _unpack_uuid(packed) == value:
+            return packed
+    return value
+
+def _unpack_uuid(value):
+    if type(value) is bytes:
+        h = value.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+    return value
+
+def uuid_key(task_uuid):
+    """The key indexes use for a uuid string, the packed form for canonical uuids"""
+    return _pack_uuid(task_uuid)
+
+def uuid_from_key(key):
+    """The uuid string of a uuid_key()"""
+    return _unpack_uuid(key)
+
+def task_uuid_key(task):
+    """uuid_key() of a task or task dict without building its uuid string, None if it has no uuid"""
+    if isinstance(task, Task):
+        return None if task._uuid is _MISSING else task._uuid
+    return _pack_uuid(task.get("uuid"))
+
+def _pack_created(value):
+    """Seconds since 1970-01-01 in local wall time for well formed dates, anything else is kept as is"""
+    if type(value) is str and len(value) == 19:
+        try:
+            created = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        seconds = (created - _EPOCH) // timedelta(seconds=1)
+        if _unpack_created(seconds) == value:
+            return seconds
+    return value
+
+def _unpack_created(value):
+    if type(value) is int:
+        return (_EPOCH + timedelta(seconds=value)).isoformat(' ')
+    return value
+
+class Task:
+    """
+    A task with fixed slots instead of a dict, the uuid is packed into 16 bytes
+    and the creation date into an int. It keeps the dict interface the rest of
+    the code uses, keys outside of the schema live in the extra dict.
+    """
+    __slots__ = ("_uuid", "id", "description", "due", "_created", "done", "flagged", "category_id", "extra")
+
+    def __init__(self, task_uuid=_MISSING, task_id=_MISSING, description=_MISSING, due=_MISSING,
+                 created=_MISSING, done=_MISSING, flagged=_MISSING, category_id=_MISSING):
+        self._uuid = _pack_uuid(task_uuid)
+        self.id = task_id
+        self.description = description
+        self.due = due
+        self._created = _pack_created(created)
+        self.done = done
+        self.flagged = flagged
+        self.category_id = category_id
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, task_dict):
+        task = cls(*(task_dict.get(key, _MISSING) for key in FIELDS))
+        for key, value in task_dict.items():
+            if key not in FIELDS:
+                task[key] = value
+        return task
+
+    @classmethod
+    def from_packed(cls, packed_uuid, task_id, description, due, created_seconds, done, flagged, category_id, extra):
+        """Build a task from already packed values, the inverse of packed()"""
+        task = cls.__new__(cls)
+        task._uuid = packed_uuid
+        task.id = task_id
+        task.description = description
+        task.due = due
+        task._created = created_seconds
+        task.done = done
+        task.flagged = flagged
+        task.category_id = category_id
+        task.extra = extra
+        return task
+
+    def packed(self) -> tuple:
+        """The slot values as stored, uuid and creation date included in their packed form"""
+        return (self._uuid, self.id, self.description, self.due, self._created,
+                self.done, self.flagged, self.category_id, self.extra)
+
+    def assign(self, other: "Task"):
+        """Take over the stored content of other in place, the display id stays"""
+        self._uuid = other._uuid
+        self.description = other.description
+        self.due = other.due
+        self._created = other._created
+        self.done = other.done
+        self.flagged = other.flagged
+        self.category_id = other.category_id
+        self.extra = dict(other.extra) if other.extra else None
+
+    def fingerprint(self) -> int:
+        """Hash of the stored content without the display id, tells which tasks changed since they were read"""
+        extra = tuple(sorted((key, repr(value)) for key, value in self.extra.items())) if self.extra else None
+        return hash((self._uuid, self.description, self.due, self._created,
+                     self.done, self.flagged, self.category_id, extra))
+
+    def to_dict(self) -> dict:
+        task_dict = {
+            "uuid": _unpack_uuid(self._uuid),
+            "id": self.id,
+            "description": self.description,
+            "due": self.due,
+            "created": _unpack_created(self._created),
+            "done": self.done,
+            "flagged": self.flagged,
+            "category_id": self.category_id
+        }
+        if _MISSING in task_dict.values():
+            task_dict = {key: value for key, value in task_dict.items() if value is not _MISSING}
+        if self.extra:
+            task_dict.update(self.extra)
+        return task_dict
+
+    def _get(self, key):
+        if key == "uuid":
+            return _unpack_uuid(self._uuid)
+        if key == "created":
+            return _unpack_created(self._created)
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            value = self._get(key)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "uuid":
+            self._uuid = _pack_uuid(value)
+        elif key == "created":
+            self._created = _pack_created(value)
+        elif key in FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key == "uuid":
+            self._uuid = _MISSING
+        elif key == "created":
+            self._created = _MISSING
+        elif key in FIELDS:
+            setattr(self, key, _MISSING)
+        else:
+            del self.extra[key]
+
+    def __contains__(self, key):
+        if key in FIELDS:
+            return self._get(key) is not _MISSING
+        return bool(self.extra) and key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def copy(self) -> "Task":
+        return Task.from_dict(self.to_dict())
+
+    def __eq__(self, other):
+        if isinstance(other, Task):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+def to_json(obj):
+    """json default hook, lets json.dump() write Task objects"""
+    if isinstance(obj, Task):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,138 @@
+import bisect
+
+import todoism.taskrecord as rec
+
+class TaskStore(list):
+    """
+    The list of all tasks in insertion order, indexed by uuid and by category.
+    It is still a plain list for iteration, json and slicing, adding and
+    deleting should go through append() and delete_uuids() to keep the indexes
+    up to date, any other mutation drops them and they are rebuilt on next use.
+    Every indexed task keeps the sequence number it was indexed with, its
+    position is that number minus the deleted ones before it. The indexes
+    are keyed by the packed uuid of rec.task_uuid_key(), not by uuid strings.
+    """
+    def __init__(self, tasks=()):
+        super().__init__(tasks)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._tasks_by_uuid = None
+        self._tasks_by_category = None
+        # uuid key -> sequence number, sorted sequence numbers deleted since the indexes were built
+        self._sequences = {}
+        self._deleted_sequences = []
+        self._next_sequence = 0
+
+    def _ensure_indexes(self):
+        if self._tasks_by_uuid is not None:
+            return
+        self._tasks_by_uuid = {}
+        self._tasks_by_category = {}
+        for task in self:
+            self._index(task)
+
+    def _index(self, task):
+        key = rec.task_uuid_key(task)
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        if key is None:
+            return
+        self._tasks_by_uuid[key] = task
+        self._sequences[key] = sequence
+        self._tasks_by_category.setdefault(task.get("category_id", 0), {})[key] = task
+
+    def _unindex(self, task):
+        key = rec.task_uuid_key(task)
+        self._tasks_by_uuid.pop(key, None)
+        bisect.insort(self._deleted_sequences, self._sequences.pop(key))
+        category_tasks = self._tasks_by_category.get(task.get("category_id", 0))
+        if category_tasks is not None:
+            category_tasks.pop(key, None)
+
+    def append(self, task):
+        self._ensure_indexes()
+        super().append(task)
+        self._index(task)
+
+    def extend(self, tasks):
+        for task in tasks:
+            self.append(task)
+
+    def get(self, task_uuid):
+        """Get a task by its uuid, None if there is none"""
+        self._ensure_indexes()
+        return self._tasks_by_uuid.get(rec.uuid_key(task_uuid))
+
+    def position_of(self, task_uuid) -> int:
+        """Get the index of a task by its uuid, -1 if there is none"""
+        self._ensure_indexes()
+        return self._position(rec.uuid_key(task_uuid))
+
+    def _position(self, key) -> int:
+        sequence = self._sequences.get(key)
+        if sequence is None:
+            return -1
+        return sequence - bisect.bisect_left(self._deleted_sequences, sequence)
+
+    def by_category(self, category_id) -> list:
+        """Get the tasks of a category in insertion order"""
+        self._ensure_indexes()
+        return list(self._tasks_by_category.get(category_id, {}).values())
+
+    def delete_uuids(self, task_uuids):
+        """Delete all tasks whose uuid is in task_uuids"""
+        self._ensure_indexes()
+        keys = [key for key in set(map(rec.uuid_key, task_uuids)) if key in self._tasks_by_uuid]
+        if not keys:
+            return
+        if len(keys) * 8 < len(self):
+            # Few deletions, remove them one by one from the back
+            positions = sorted((self._position(key) for key in keys), reverse=True)
+            for position in positions:
+                self._unindex(self[position])
+                super().__delitem__(position)
+        else:
+            deleted = set(keys)
+            self[:] = [task for task in self if rec.task_uuid_key(task) not in deleted]
+
+    def reindex(self):
+        """Rebuild the indexes after tasks were changed in place, e.g. their category"""
+        self._invalidate()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._invalidate()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._invalidate()
+
+    def __iadd__(self, tasks):
+        self.extend(tasks)
+        return self
+
+    def insert(self, index, task):
+        super().insert(index, task)
+        self._invalidate()
+
+    def remove(self, task):
+        super().remove(task)
+        self._invalidate()
+
+    def pop(self, index=-1):
+        task = super().pop(index)
+        self._invalidate()
+        return task
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate()
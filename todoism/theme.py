@@ -1,8 +1,6 @@
-import json
 import curses
 
 import todoism.state as st
-import todoism.preference as pref
 
 SELECTION_COLOR_PAIR_NUM = 100
 BACKGROUND_COLOR_PAIR_NUM = 101
@@ -21,41 +19,72 @@ color_set = {
     "grey": [9, 244]
 }
 
+DIMMED_PAIR_OFFSET = 200
+
+# Attribute ints resolved once by setup_color_pairs() and apply_theme(),
+# drawing code only looks them up and never initializes pairs itself
+_color_attrs = {}
+_dimmed_attrs = {}
+_bkg_attr = 0
+_selection_attr = 0
+_selection_color = None
+# Redefining a pair makes some terminals repaint every cell using it
+_init_pair_count = 0
+
+def _init_pair(pair_num, foreground, background):
+    global _init_pair_count
+    curses.init_pair(pair_num, foreground, background)
+    _init_pair_count += 1
+
+def get_init_pair_count() -> int:
+    """Number of curses.init_pair calls so far, a repaint must not add to it"""
+    return _init_pair_count
+
 def setup_color_pairs():
-    for color in color_set.values():
-        curses.init_pair(color[0], color[1], get_color_code_by_str("black"))
-    curses.init_pair(BACKGROUND_COLOR_PAIR_NUM, get_color_code_by_str("white"), get_color_code_by_str("black"))
-    curses.init_pair(SELECTION_COLOR_PAIR_NUM, get_color_code_by_str("black"), get_theme_color_curses())
+    """Allocate every pair of the palette once, dimmed variants included"""
+    global _bkg_attr, _selection_color
+    black = get_color_code_by_str("black")
+    for name, color in color_set.items():
+        _init_pair(color[0], color[1], black)
+        _color_attrs[name] = curses.color_pair(color[0])
+        _init_pair(DIMMED_PAIR_OFFSET + color[0], get_dimmed_color_code(color[1]), black)
+        _dimmed_attrs[name] = curses.color_pair(DIMMED_PAIR_OFFSET + color[0])
+    _init_pair(BACKGROUND_COLOR_PAIR_NUM, get_color_code_by_str("white"), black)
+    _bkg_attr = curses.color_pair(BACKGROUND_COLOR_PAIR_NUM)
+    _selection_color = None
+    apply_theme()
+
+def apply_theme():
+    """Resolve the selection pair from st.theme_color, call again whenever the theme changes"""
+    global _selection_attr, _selection_color
+    theme_color = get_theme_color_curses()
+    if theme_color == _selection_color:
+        return
+    _init_pair(SELECTION_COLOR_PAIR_NUM, get_color_code_by_str("black"), theme_color)
+    _selection_attr = curses.color_pair(SELECTION_COLOR_PAIR_NUM)
+    _selection_color = theme_color
 
 def get_theme_color_curses() -> int:
-    try:
-        with open(pref.get_settings_file_path(), 'r') as settings_file:
-            settings = json.load(settings_file)
-            color = settings["selected_color"]
-            if color not in color_set:
-                color = "blue"
-            return color_set[color][1]
-    except (FileNotFoundError, json.JSONDecodeError, KeyError):
-        color_str = pref.setup_default_settings()["selected_color"]
-        return get_color_code_by_str(color_str)
-    except Exception:
-        return curses.COLOR_BLUE
+    color = st.theme_color if st.theme_color in color_set else "blue"
+    return color_set[color][1]
 
 def get_theme_color_pair_for_text() -> int:
     return get_color_pair_by_str(st.theme_color)
 
 def get_theme_color_pair_for_selection() -> int:
-    curses.init_pair(SELECTION_COLOR_PAIR_NUM, get_color_code_by_str("black"), get_theme_color_curses())
-    return curses.color_pair(SELECTION_COLOR_PAIR_NUM)
+    return _selection_attr
 
 def get_color_pair_by_str(color: str) -> int:
-    return curses.color_pair(get_color_pair_num_by_str(color))
+    attr = _color_attrs.get(color)
+    if attr is None:
+        attr = curses.color_pair(get_color_pair_num_by_str(color))
+    return attr
 
 def get_color_pair_num_by_str(color: str) -> int:
     return color_set[color][0]
     
 def get_bkg_color_pair() -> int:
-    return curses.color_pair(BACKGROUND_COLOR_PAIR_NUM)
+    return _bkg_attr
 
 def get_color_code_by_str(color: str) -> int:
     return color_set[color][1]
@@ -107,20 +136,22 @@ def get_dimmed_color_pair(color_str, pair_num=None):
     
     Args:
         color_str (str): The color name to get from color_set
-        pair_num (int, optional): Custom pair number to use. If None, uses a high number.
+        pair_num (int, optional): Custom pair number to use. If None, uses the
+            pair allocated by setup_color_pairs().
         
     Returns:
         int: Color pair attribute for the dimmed color
     """
     if color_str not in color_set:
         return 0
-        
-    original_code = color_set[color_str][1]
-    dimmed_code = get_dimmed_color_code(original_code)
     
-    # Use a high pair number to avoid conflicts
-    if pair_num is None:
-        pair_num = 200 + color_set[color_str][0]
+    palette_pair_num = DIMMED_PAIR_OFFSET + color_set[color_str][0]
+    if pair_num is None or pair_num == palette_pair_num:
+        attr = _dimmed_attrs.get(color_str)
+        if attr is None:
+            _init_pair(palette_pair_num, get_dimmed_color_code(color_set[color_str][1]), get_color_code_by_str("black"))
+            attr = _dimmed_attrs[color_str] = curses.color_pair(palette_pair_num)
+        return attr
         
-    curses.init_pair(pair_num, dimmed_code, get_color_code_by_str("black"))
+    _init_pair(pair_num, get_dimmed_color_code(color_set[color_str][1]), get_color_code_by_str("black"))
     return curses.color_pair(pair_num)
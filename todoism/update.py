@@ -1,6 +1,21 @@
+import os
 import json
 import time
+import threading
+
 import todoism.preference as pref
+import todoism.eventloop as ev
+
+# Overridable to check against a local server, e.g. test/update_stub.py
+UPDATE_URL = os.environ.get("TODOISM_UPDATE_URL", "https://pypi.org/pypi/todoism/json")
+# Seconds between two checks
+CHECK_INTERVAL = 86400
+
+# Written by the check thread, read by poll_update() in the UI thread.
+# latest_version is only set when it is newer than the running version.
+_result = {}
+_checked = threading.Event()
+_announced = False
 
 def get_current_version() -> str:
     """
@@ -15,93 +30,98 @@ def get_current_version() -> str:
         import pkg_resources
         return pkg_resources.get_distribution("todoism").version
 
-def check_for_updates() -> bool:
-    """
-    Check if a newer version of todoism is available on PyPI.
-    Checks at most once per day and uses settings.json to store the last check time.
-    """
-    import sys
-    import urllib.request
+def is_newer_version(latest_version: str, current_version: str) -> bool:
+    """Compare two version strings, prereleases of the current version are never updated"""
     import re
-    
-    settings_path = pref.get_settings_file_path()
-    
-    # Only check once per day - if we've checked recently, skip network request
-    current_time = time.time()
-    
-    try:
-        with open(settings_path, 'r') as f:
-            settings = json.load(f)
-            last_check = settings.get('last_update_check', 0)
-            # If checked within last 24 hours, skip check
-            if current_time - last_check < 86400:  # 24 hours
-                return False  # Don't show update notification if we checked recently
-    except (json.JSONDecodeError, FileNotFoundError):
-        # If settings file is missing or invalid, we'll create/update it below
-        pass
-            
-    # Update the timestamp in settings regardless of check result
     try:
-        with open(settings_path, 'r') as f:
-            try:
-                settings = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                settings = pref.default_settings
+        from packaging import version
+        parsed_version = version.parse(current_version)
+        if parsed_version.is_prerelease:
+            return False
+        return version.parse(latest_version) > parsed_version
+    except ImportError:
+        # Fallback to simpler parsing if packaging module not available
+        def parse_version(v):
+            return [int(x) for x in re.findall(r'\d+', v)]
         
-        settings['last_update_check'] = current_time
+        current_parts = parse_version(current_version)
+        latest_parts = parse_version(latest_version)
         
-        with open(settings_path, 'w') as f:
-            json.dump(settings, f, indent=4)
-    except Exception:
-        pass
-    
-    try:
-        # Get current installed version
-        if sys.version_info >= (3, 8):
-            import importlib.metadata
-            current_version = importlib.metadata.version("todoism")
-        else:
-            import pkg_resources
-            current_version = pkg_resources.get_distribution("todoism").version
-        
-        # Query PyPI with short timeout to not block the app
-        req = urllib.request.Request(
-            "https://pypi.org/pypi/todoism/json",
-            headers={"User-Agent": "todoism-update-check"}
-        )
-        with urllib.request.urlopen(req, timeout=0.5) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            latest_version = data["info"]["version"]
+        for i in range(max(len(current_parts), len(latest_parts))):
+            current_part = current_parts[i] if i < len(current_parts) else 0
+            latest_part = latest_parts[i] if i < len(latest_parts) else 0
             
-            # Use packaging's version parser for accurate comparison
-            try:
-                from packaging import version
-                parsed_version = version.parse(current_version)
-                if parsed_version.is_prerelease:
-                    return False
-                return version.parse(latest_version) > version.parse(current_version)
-            except ImportError:
-                # Fallback to simpler parsing if packaging module not available
-                def parse_version(v):
-                    return [int(x) for x in re.findall(r'\d+', v)]
-                
-                current_parts = parse_version(current_version)
-                latest_parts = parse_version(latest_version)
+            if latest_part > current_part:
+                return True
+            elif current_part > latest_part:
+                return False
                 
-                for i in range(max(len(current_parts), len(latest_parts))):
-                    current_part = current_parts[i] if i < len(current_parts) else 0
-                    latest_part = latest_parts[i] if i < len(latest_parts) else 0
-                    
-                    if latest_part > current_part:
-                        return True
-                    elif current_part > latest_part:
-                        return False
-                        
-                return False  # Versions are equal
+        return False  # Versions are equal
+
+def fetch_latest_version(url: str = None, timeout: float = 5) -> str:
+    """Ask the package index for the latest released version"""
+    import urllib.request
+    req = urllib.request.Request(
+        url or UPDATE_URL,
+        headers={"User-Agent": "todoism-update-check"}
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        data = json.loads(response.read().decode('utf-8'))
+    return data["info"]["version"]
+
+def start_update_check(url: str = None):
+    """
+    Check for a newer version of todoism in a daemon thread, at most once per day.
+    A newer version found by an earlier check is announced right away from settings.json.
+    The result is picked up by poll_update(), nothing here blocks the caller.
+    """
+    global _announced
+    _announced = False
+    _checked.clear()
+    try:
+        current_version = get_current_version()
     except Exception:
-        # Silent failure - don't interrupt startup
-        return False
+        return
+    
+    cached_version = pref.get_setting("latest_version")
+    if cached_version and is_newer_version(cached_version, current_version):
+        _result["latest_version"] = cached_version
+    
+    if time.time() - pref.get_setting("last_update_check", 0) < CHECK_INTERVAL:
+        return
     
+    def worker():
+        try:
+            latest_version = fetch_latest_version(url)
+            if is_newer_version(latest_version, current_version):
+                _result["latest_version"] = latest_version
+            _result["checked"] = (time.time(), latest_version)
+        except Exception:
+            # Silent failure, a DNS stall or being offline must not show up in the UI
+            pass
+        finally:
+            _checked.set()
+            ev.notify()
+    
+    threading.Thread(target=worker, daemon=True).start()
+
+def poll_update():
+    """
+    Called from the UI thread. Stores a finished check in settings.json and
+    returns the newer version the first time one is known, None otherwise.
+    """
+    global _announced
+    if _checked.is_set() and "checked" in _result:
+        checked_at, latest_version = _result.pop("checked")
+        pref.set_setting("last_update_check", checked_at)
+        pref.set_setting("latest_version", latest_version)
+    if _announced:
+        return None
+    latest_version = _result.get("latest_version")
+    if latest_version:
+        _announced = True
+    return latest_version
+
 def update_todoism() -> bool:
     """
     Update todoism package.
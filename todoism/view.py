@@ -0,0 +1,118 @@
+import bisect
+
+import todoism.state as st
+import todoism.overlay as ov
+
+# Sorted view kept in st.current_cat_tasks, _keys[i] is the sort key of its i-th task.
+# Marked tasks (done/flagged, depending on preferences) come first, the rest
+# follow the sidebar category order, ties keep their insertion order.
+_keys = []
+_tasks = None
+_categories = None
+_sort_prefs = None
+_category_order = {}
+_next_tiebreak = 0
+
+def _is_marked(task) -> bool:
+    if st.sort_by_done and st.sort_by_flagged:
+        return task["done"] or task["flagged"]
+    elif st.sort_by_done:
+        return task["done"]
+    elif st.sort_by_flagged:
+        return task["flagged"]
+    else:
+        return False
+
+def _sort_key(task, tiebreak) -> tuple:
+    if _is_marked(task):
+        return (0, st.sort_by_flagged and not task["flagged"], st.sort_by_done and not task["done"], tiebreak)
+    category_pos = _category_order.get(task["category_id"], len(_category_order))
+    return (1, category_pos, False, tiebreak)
+
+def _renumber(start, end):
+    for i in range(start, end):
+        _tasks[i]["id"] = i + 1
+
+def _index_of(task) -> int:
+    index = task["id"] - 1
+    if 0 <= index < len(_tasks) and _tasks[index] is task:
+        return index
+    for i, t in enumerate(_tasks):
+        if t is task:
+            return i
+    return -1
+
+@ov.timed("sort")
+def rebuild(categories):
+    """Fully sort st.current_cat_tasks, tasks are expected in insertion order"""
+    global _keys, _tasks, _categories, _sort_prefs, _category_order, _next_tiebreak
+    _categories = categories
+    _sort_prefs = (st.sort_by_done, st.sort_by_flagged)
+    _category_order = {c["id"]: i for i, c in enumerate(categories)}
+    pairs = sorted(
+        ((_sort_key(task, i), task) for i, task in enumerate(st.current_cat_tasks)),
+        key=lambda pair: pair[0]
+    )
+    _keys = [pair[0] for pair in pairs]
+    _tasks = [pair[1] for pair in pairs]
+    _next_tiebreak = len(_tasks)
+    st.current_cat_tasks = _tasks
+    _renumber(0, len(_tasks))
+
+def sync(categories):
+    """Rebuild only if the task list, the categories or the sort preferences were replaced"""
+    if (st.current_cat_tasks is not _tasks
+            or categories is not _categories
+            or _sort_prefs != (st.sort_by_done, st.sort_by_flagged)):
+        rebuild(categories)
+
+def _in_sync() -> bool:
+    return _tasks is not None and st.current_cat_tasks is _tasks
+
+def contains(task) -> bool:
+    return _in_sync() and _index_of(task) >= 0
+
+@ov.timed("sort")
+def reposition(task) -> bool:
+    """Move a task whose done/flagged state changed to its new place"""
+    if not _in_sync():
+        return False
+    old_index = _index_of(task)
+    if old_index < 0:
+        return False
+    tiebreak = _keys[old_index][-1]
+    del _keys[old_index]
+    del _tasks[old_index]
+    key = _sort_key(task, tiebreak)
+    new_index = bisect.bisect_left(_keys, key)
+    _keys.insert(new_index, key)
+    _tasks.insert(new_index, task)
+    _renumber(min(old_index, new_index), max(old_index, new_index) + 1)
+    return True
+
+@ov.timed("sort")
+def insert(task) -> bool:
+    """Insert a newly added task, returns False if the view has to be rebuilt instead"""
+    global _next_tiebreak
+    if not _in_sync():
+        return False
+    key = _sort_key(task, _next_tiebreak)
+    _next_tiebreak += 1
+    index = bisect.bisect_left(_keys, key)
+    _keys.insert(index, key)
+    _tasks.insert(index, task)
+    _renumber(index, len(_tasks))
+    return True
+
+@ov.timed("sort")
+def remove(task) -> bool:
+    """Remove a deleted task, returns False if the view has to be rebuilt instead"""
+    if not _in_sync():
+        return False
+    index = _index_of(task)
+    if index < 0:
+        return False
+    del _keys[index]
+    del _tasks[index]
+    _renumber(index, len(_tasks))
+    return True
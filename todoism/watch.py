@@ -0,0 +1,112 @@
+import os
+import sys
+import struct
+import threading
+
+import todoism.eventloop as ev
+
+# Seconds between two looks at the files when inotify is not available
+POLL_INTERVAL = 1.0
+
+# inotify(7) constants
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+_paths = []
+_names = set()
+_changed = False
+_inotify_fd = None
+_poller = None
+_stopped = threading.Event()
+
+def start(paths):
+    """
+    Watch the given files for changes by other processes. Their directory is
+    watched, as files are replaced by renaming. Uses inotify on Linux and polls
+    the files' stat in a thread elsewhere, both wake up the main loop.
+    """
+    global _paths, _names, _inotify_fd, _poller
+    if _paths:
+        return
+    _paths = list(paths)
+    _names = {os.path.basename(path) for path in _paths}
+    _inotify_fd = _start_inotify({os.path.dirname(path) for path in _paths})
+    if _inotify_fd is not None:
+        ev.register(_inotify_fd, _read_inotify_events)
+    else:
+        _stopped.clear()
+        _poller = threading.Thread(target=_poll, daemon=True)
+        _poller.start()
+
+def stop():
+    global _paths, _inotify_fd, _poller
+    if _inotify_fd is not None:
+        ev.unregister(_inotify_fd)
+        os.close(_inotify_fd)
+    _stopped.set()
+    _paths = []
+    _inotify_fd = None
+    _poller = None
+
+def take_changed() -> bool:
+    """True once after any of the watched files changed"""
+    global _changed
+    changed, _changed = _changed, False
+    return changed
+
+def _start_inotify(directories):
+    """The inotify fd watching all directories, None if inotify is not available"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        for directory in directories:
+            if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_MASK) < 0:
+                os.close(fd)
+                return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+def _read_inotify_events():
+    global _changed
+    while True:
+        try:
+            data = os.read(_inotify_fd, 4096)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if os.fsdecode(name) in _names:
+                _changed = True
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _poll():
+    global _changed
+    signatures = [_signature(path) for path in _paths]
+    while not _stopped.wait(POLL_INTERVAL):
+        current = [_signature(path) for path in _paths]
+        if current != signatures:
+            signatures = current
+            _changed = True
+            ev.notify()